@@ -1,19 +1,27 @@
+import asyncio
+import itertools
+import os
 import subprocess
 import logging
-import time
 
 class CloudNomad:
-    def __init__(self, providers, migration_trigger):
+    def __init__(self, providers, migration_trigger, interval=3600):
         self.providers = providers
         self.migration_trigger = migration_trigger  # e.g., "uptime<99%"
+        self.interval = interval
+        # Parse the trigger once; a bare value like "99%" is read as the uptime threshold
+        _, value = migration_trigger.split("<", 1) if "<" in migration_trigger else ("uptime", migration_trigger)
+        self._threshold = float(value.replace("%", "").strip())
+        self._next_provider_cycle = itertools.cycle(self.providers[1:] + self.providers[:1])
 
-    def check_uptime(self):
+    async def check_uptime(self):
         # Placeholder logic (replace with real ping or API-based uptime monitoring)
         try:
-            output = subprocess.check_output(["uptime"]).decode()
-            logging.info(f"[CloudNomad] Current uptime check: {output}")
+            # Same load figures `uptime` prints, read with one syscall instead of a fork
+            load1, load5, load15 = os.getloadavg()
+            logging.info("[CloudNomad] Current load: %.2f %.2f %.2f", load1, load5, load15)
             return 99.8  # Simulated %
-        except Exception as e:
+        except OSError as e:
             logging.error(f"[CloudNomad] Uptime check failed: {e}")
             return 0
 
@@ -22,11 +30,10 @@ class CloudNomad:
         # Placeholder — insert Terraform or Ansible-based VPS deploy call here
         subprocess.call(["./deployments/cloud_init_" + target_provider.lower() + ".sh"])
 
-    def monitor(self):
+    async def monitor(self):
         while True:
-            current_uptime = self.check_uptime()
-            threshold = float(self.migration_trigger.split("<")[1].replace("%", ""))
-            if current_uptime < threshold:
-                next_provider = self.providers[1 % len(self.providers)]  # Rotate
-                self.migrate(next_provider)
-            time.sleep(3600)  # Check every hour
\ No newline at end of file
+            current_uptime = await self.check_uptime()
+            if current_uptime < self._threshold:
+                next_provider = next(self._next_provider_cycle)  # Rotate
+                await asyncio.to_thread(self.migrate, next_provider)
+            await asyncio.sleep(self.interval)  # Check every hour
@@ -2,11 +2,28 @@
 
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 
 class ComplianceAgent:
-    def __init__(self, rule_sources=None):
+    def __init__(self, rule_sources=None, fetch_timeout=0.5):
         self.rule_sources = rule_sources or ["esma_rss_feed", "nfa_database"]
         self.current_leverage = 50  # default
+        self.fetch_timeout = fetch_timeout  # seconds budget for all rule feeds
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.rule_sources)))
+
+        # Resolve the configured sources to bound fetchers once, in precedence order
+        self._sources = frozenset(self.rule_sources)
+        self._fetchers = [
+            (fn, name) for key, fn, name in (
+                ("esma_rss_feed", self.fetch_esma_rules, "esma"),
+                ("nfa_database", self.fetch_nfa_rules, "nfa"),
+            ) if key in self._sources
+        ]
+
+        # Regulatory caps change on the order of days; cache the merged rule table
+        self._rules_cache = None
+        self._rules_cache_ts = 0.0
+        self._rules_ttl = 3600  # seconds
 
     def fetch_esma_rules(self):
         # Simulated ESMA feed lookup
@@ -30,12 +47,37 @@ class ComplianceAgent:
             print(f"Error fetching NFA rules: {e}")
             return {}
 
-    def resolve_leverage(self, asset):
+    def get_rules(self, force_refresh=False):
+        """Return the merged rule table, refetching only when the cache is stale"""
+        if (not force_refresh and self._rules_cache is not None
+                and time.time() - self._rules_cache_ts < self._rules_ttl):
+            return self._rules_cache
+
+        fetchers = self._fetchers
+
+        # Query all feeds at once; a slow feed is skipped instead of blocking enforcement
+        futures = {self._pool.submit(fn): name for fn, name in fetchers}
+        results = {}
+        try:
+            for future in as_completed(futures, timeout=self.fetch_timeout):
+                results[futures[future]] = future.result()
+        except FuturesTimeoutError:
+            slow = [name for future, name in futures.items() if not future.done()]
+            print(f"Skipping slow rule sources: {', '.join(slow)}")
+
+        # Merge in source order so precedence does not depend on completion order
         rules = {}
-        if "esma_rss_feed" in self.rule_sources:
-            rules.update(self.fetch_esma_rules())
-        if "nfa_database" in self.rule_sources:
-            rules.update(self.fetch_nfa_rules())
+        for _, name in fetchers:
+            rules.update(results.get(name, {}))
+
+        # Only cache a complete table so a timed-out feed is retried next call
+        if len(results) == len(fetchers):
+            self._rules_cache = rules
+            self._rules_cache_ts = time.time()
+        return rules
+
+    def resolve_leverage(self, asset, force_refresh=False):
+        rules = self.get_rules(force_refresh=force_refresh)
 
         if asset in rules:
             max_leverage = rules[asset]["max_leverage"]
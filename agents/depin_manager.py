@@ -1,39 +1,102 @@
-import time
+import asyncio
 import logging
-from typing import List
+import os
+import sys
+from typing import Dict, List, Optional
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.cloud_nomad import CloudNomad
 
 class DePINManager:
-    def __init__(self, providers: List[str], min_uptime: float = 99.95):
+    def __init__(self, providers: List[str], min_uptime: float = 99.95,
+                 status_urls: Optional[Dict[str, str]] = None, interval: int = 300):
         self.providers = providers
         self.min_uptime = min_uptime
+        # Last measured uptime per provider
         self.status = {provider: 100.0 for provider in providers}
+        # Smoothed uptime per provider, so failover can try the historically best one first
+        self._uptime_ewma = dict(self.status)
+        self.status_urls = status_urls or {}
         self.active_provider = providers[0]
+        self.interval = interval
+        self._session: Optional[aiohttp.ClientSession] = None
         logging.basicConfig(level=logging.INFO)
 
-    def check_provider_uptime(self, provider: str) -> float:
-        # Placeholder: Integrate real uptime monitoring APIs here
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+
+    async def check_provider_uptime(self, provider: str) -> float:
         logging.info(f"Checking uptime for {provider}")
-        return self.status.get(provider, 100.0)
+        url = self.status_urls.get(provider)
+        if not url:
+            # Placeholder: no status endpoint configured for this provider
+            return self.status.get(provider, 100.0)
+
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    uptime = 0.0
+                else:
+                    payload = await response.json(content_type=None)
+                    uptime = float(payload.get("uptime", 100.0))
+        except Exception as e:
+            logging.error(f"Uptime probe failed for {provider}: {e}")
+            uptime = 0.0
+
+        self.status[provider] = uptime
+        self._uptime_ewma[provider] = 0.9 * self._uptime_ewma.get(provider, uptime) + 0.1 * uptime
+        return uptime
 
     def switch_provider(self, new_provider: str):
         logging.warning(f"Switching from {self.active_provider} to {new_provider}")
         self.active_provider = new_provider
         # Add real migration logic here (e.g., redeploy containers, DNS updates)
 
-    def monitor(self):
+    async def monitor(self):
         while True:
-            uptime = self.check_provider_uptime(self.active_provider)
+            uptime = await self.check_provider_uptime(self.active_provider)
             logging.info(f"Current uptime of {self.active_provider}: {uptime}%")
             if uptime < self.min_uptime:
-                for provider in self.providers:
-                    if provider != self.active_provider:
-                        alt_uptime = self.check_provider_uptime(provider)
-                        if alt_uptime >= self.min_uptime:
-                            self.switch_provider(provider)
-                            break
-            time.sleep(300)  # Check every 5 minutes
+                await self.failover()
+            await asyncio.sleep(self.interval)  # Check every 5 minutes
 
-if __name__ == "__main__":
+    async def failover(self):
+        candidates = [p for p in self.providers if p != self.active_provider]
+        if not candidates:
+            return
+        
+        # Fast path: one probe against the provider with the best track record
+        best = max(candidates, key=self._uptime_ewma.get)
+        if await self.check_provider_uptime(best) >= self.min_uptime:
+            self.switch_provider(best)
+            return
+        
+        # Otherwise probe the rest concurrently so failover costs one more round-trip
+        rest = [p for p in candidates if p != best]
+        results = await asyncio.gather(*[self.check_provider_uptime(p) for p in rest])
+        for provider, alt_uptime in zip(rest, results):
+            if alt_uptime >= self.min_uptime:
+                self.switch_provider(provider)
+                break
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+async def main():
     providers = ["Hetzner", "Akash", "AWS"]
     manager = DePINManager(providers)
-    manager.monitor()
\ No newline at end of file
+    nomad = CloudNomad(providers, migration_trigger="uptime<99%")
+    try:
+        # Both supervisors share one event loop instead of parking a thread each
+        await asyncio.gather(manager.monitor(), nomad.monitor())
+    finally:
+        await manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
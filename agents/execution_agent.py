@@ -1,11 +1,17 @@
 # agents/execution_agent.py
 
 import time
+import itertools
 import logging
 import os
 import sys
+import threading
+from dataclasses import dataclass, fields
 from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -16,24 +22,84 @@ from agents.utils.portfolio import add_trade, update_equity
 # Load environment variables
 load_dotenv()
 
-try:
-    import oandapyV20
-    from oandapyV20 import API
-    from oandapyV20.endpoints.orders import OrderCreate
-    from oandapyV20.endpoints.accounts import AccountDetails
-    from oandapyV20.endpoints.pricing import PricingInfo
-    OANDA_AVAILABLE = True
-except ImportError:
-    OANDA_AVAILABLE = False
-    print("[WARNING] OANDA API not available. Install oandapyV20 for live trading.")
+_oanda = None
+
+def _lazy_oanda():
+    """Import the OANDA SDK on first use; returns None if it isn't installed"""
+    global _oanda
+    if _oanda is None:
+        try:
+            from oandapyV20 import API
+            from oandapyV20.endpoints.orders import OrderCreate
+            from oandapyV20.endpoints.accounts import AccountDetails
+            from oandapyV20.endpoints.pricing import PricingInfo
+            from oandapyV20.endpoints.transactions import TransactionsStream
+            _oanda = SimpleNamespace(
+                API=API, OrderCreate=OrderCreate, AccountDetails=AccountDetails,
+                PricingInfo=PricingInfo, TransactionsStream=TransactionsStream
+            )
+        except ImportError:
+            _oanda = False
+            print("[WARNING] OANDA API not available. Install oandapyV20 for live trading.")
+    return _oanda or None
+
+@dataclass(slots=True)
+class Trade:
+    """A filled trade, timestamped in integer nanoseconds"""
+    timestamp_ns: int
+    instrument: str
+    units: int
+    fill_price: float
+    broker: str
+    trade_id: str
+    execution_time_ms: float
+    direction: str
+    size: int
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    strategy_id: str = "unknown"
+    
+    def iso(self):
+        """Format the timestamp as ISO-8601 only when something reads it"""
+        # Whole seconds and microseconds separately, so the string truncates timestamp_ns exactly
+        seconds, ns = divmod(self.timestamp_ns, 1_000_000_000)
+        return datetime.utcfromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
+    
+    def to_dict(self):
+        """Plain dict for JSON persistence and logging"""
+        # Fields are all scalars, so a shallow getattr copy is enough (asdict deep-copies)
+        data = {name: getattr(self, name) for name in _TRADE_FIELDS}
+        data["timestamp"] = self.iso()
+        return data
+
+_TRADE_FIELDS = tuple(f.name for f in fields(Trade))
+
+@dataclass(slots=True)
+class ExecStats:
+    """Per-agent execution counters"""
+    total_orders: int = 0
+    successful_orders: int = 0
+    failed_orders: int = 0
+    fallback_used: int = 0
+    sum_latency_ns: int = 0
+    latency_samples: int = 0
+    
+    def success_rate(self):
+        return self.successful_orders / max(1, self.total_orders) * 100
+    
+    def avg_latency(self):
+        """Mean OANDA order latency in ms"""
+        return self.sum_latency_ns / max(1, self.latency_samples) / 1e6
 
 class ExecutionAgent:
     """Handles trade execution across multiple brokers"""
     
-    def __init__(self, requote_tolerance=1.2, max_retries=3, fallback_latency=300):
+    def __init__(self, requote_tolerance=1.2, max_retries=3, fallback_latency=300, simulate_latency=False):
         self.requote_tolerance = requote_tolerance
         self.max_retries = max_retries
         self.fallback_latency = fallback_latency  # ms
+        self.simulate_latency = simulate_latency
+        self._fallback_counter = itertools.count(1)
         
         # Load configuration
         self.oanda_api_key = os.getenv("OANDA_API_KEY")
@@ -42,21 +108,26 @@ class ExecutionAgent:
         self.forex_api_key = os.getenv("FOREX_API_KEY")
         self.forex_account_id = os.getenv("FOREX_ACCOUNT_ID")
         
-        # Initialize OANDA API if available
+        # Initialize OANDA API if available; the SDK is only imported when a key is set
         self.oanda_api = None
-        if OANDA_AVAILABLE and self.oanda_api_key:
+        self._oanda = _lazy_oanda() if self.oanda_api_key else None
+        if self._oanda:
             environment = "practice" if self.oanda_env == "practice" else "live"
-            self.oanda_api = API(access_token=self.oanda_api_key, environment=environment)
+            self._oanda_environment = environment
+            self.oanda_api = self._oanda.API(access_token=self.oanda_api_key, environment=environment)
+            # oandapyV20 keeps one requests.Session with auth headers; size its pool so
+            # price, order and balance calls all reuse warm TLS connections
+            self.oanda_api.client.mount(
+                "https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            )
             log_event("oanda_initialized", {"environment": environment})
         
         # Track execution statistics
-        self.execution_stats = {
-            "total_orders": 0,
-            "successful_orders": 0,
-            "failed_orders": 0,
-            "avg_latency": 0.0,
-            "fallback_used": 0
-        }
+        self.stats = ExecStats()
+        
+        # Short-lived quote cache keyed by instrument (seconds)
+        self.price_cache_ttl = 1.0
+        self._price_cache = {}
         
         log_event("execution_agent_initialized", {
             "oanda_available": self.oanda_api is not None,
@@ -69,9 +140,13 @@ class ExecutionAgent:
             # Return mock prices for demo
             return {"bid": 1.1000, "ask": 1.1002, "spread": 0.0002}
         
+        cached = self._price_cache.get(instrument)
+        if cached and time.monotonic() - cached[1] < self.price_cache_ttl:
+            return cached[0]
+        
         try:
             params = {"instruments": instrument}
-            r = PricingInfo(accountID=self.oanda_account_id, params=params)
+            r = self._oanda.PricingInfo(accountID=self.oanda_account_id, params=params)
             response = self.oanda_api.request(r)
             
             price_data = response["prices"][0]
@@ -79,7 +154,9 @@ class ExecutionAgent:
             ask = float(price_data["asks"][0]["price"])
             spread = ask - bid
             
-            return {"bid": bid, "ask": ask, "spread": spread}
+            quote = {"bid": bid, "ask": ask, "spread": spread}
+            self._price_cache[instrument] = (quote, time.monotonic())
+            return quote
             
         except Exception as e:
             log_event("price_fetch_error", {"instrument": instrument, "error": str(e)})
@@ -100,7 +177,7 @@ class ExecutionAgent:
     
     def execute_order(self, order_data):
         """Execute a trading order"""
-        self.execution_stats["total_orders"] += 1
+        self.stats.total_orders += 1
         
         instrument = order_data.get("pair", "EUR_USD")
         direction = order_data.get("direction", "buy")
@@ -123,7 +200,7 @@ class ExecutionAgent:
         result = self._execute_oanda_order(instrument, units, order_type, stop_loss, take_profit)
         
         if result["success"]:
-            self.execution_stats["successful_orders"] += 1
+            self.stats.successful_orders += 1
             self._record_trade(result, order_data)
             send_trade_alert(f"✅ {direction.upper()} {instrument} {size} units executed")
             return result
@@ -133,13 +210,13 @@ class ExecutionAgent:
             fallback_result = self._execute_fallback_order(instrument, units, order_type)
             
             if fallback_result["success"]:
-                self.execution_stats["successful_orders"] += 1
-                self.execution_stats["fallback_used"] += 1
+                self.stats.successful_orders += 1
+                self.stats.fallback_used += 1
                 self._record_trade(fallback_result, order_data)
                 send_trade_alert(f"🔄 {direction.upper()} {instrument} {size} units executed via fallback")
                 return fallback_result
             else:
-                self.execution_stats["failed_orders"] += 1
+                self.stats.failed_orders += 1
                 send_critical_alert(f"❌ Failed to execute {direction} {instrument} {size} units")
                 return fallback_result
     
@@ -149,7 +226,7 @@ class ExecutionAgent:
             return {"success": False, "error": "OANDA API not available", "broker": "oanda"}
         
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             
             # Build order data
             order_data = {
@@ -169,14 +246,13 @@ class ExecutionAgent:
                 order_data["order"]["takeProfitOnFill"] = {"price": str(take_profit)}
             
             # Execute order
-            r = OrderCreate(accountID=self.oanda_account_id, data=order_data)
+            r = self._oanda.OrderCreate(accountID=self.oanda_account_id, data=order_data)
             response = self.oanda_api.request(r)
             
-            execution_time = (time.time() - start_time) * 1000  # ms
-            self.execution_stats["avg_latency"] = (
-                (self.execution_stats["avg_latency"] * (self.execution_stats["total_orders"] - 1) + execution_time) 
-                / self.execution_stats["total_orders"]
-            )
+            latency_ns = time.perf_counter_ns() - start_ns
+            self.stats.sum_latency_ns += latency_ns
+            self.stats.latency_samples += 1
+            execution_time = latency_ns / 1e6  # ms
             
             # Check for high latency
             if execution_time > self.fallback_latency:
@@ -207,8 +283,11 @@ class ExecutionAgent:
     def _execute_fallback_order(self, instrument, units, order_type="MARKET"):
         """Execute order via fallback broker (simulated)"""
         try:
+            start_ns = time.perf_counter_ns()
+            
             # Simulate fallback broker execution
-            time.sleep(0.1)  # Simulate network delay
+            if self.simulate_latency:
+                time.sleep(0.1)  # Simulate network delay
             
             # Get current price for simulation
             price_data = self.get_current_price(instrument)
@@ -218,7 +297,8 @@ class ExecutionAgent:
             slippage = 0.0001 * (1 if units > 0 else -1)
             fill_price += slippage
             
-            trade_id = f"fallback_{int(time.time())}"
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e6  # ms
+            trade_id = f"fallback_{time.time_ns()}_{next(self._fallback_counter)}"
             
             log_event("fallback_execution_success", {
                 "trade_id": trade_id,
@@ -232,7 +312,7 @@ class ExecutionAgent:
                 "broker": "fallback",
                 "trade_id": trade_id,
                 "fill_price": fill_price,
-                "execution_time_ms": 100,
+                "execution_time_ms": execution_time,
                 "units": units,
                 "instrument": instrument
             }
@@ -243,24 +323,26 @@ class ExecutionAgent:
     
     def _record_trade(self, execution_result, order_data):
         """Record the executed trade"""
-        trade_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "instrument": execution_result["instrument"],
-            "units": execution_result["units"],
-            "fill_price": execution_result["fill_price"],
-            "broker": execution_result["broker"],
-            "trade_id": execution_result["trade_id"],
-            "execution_time_ms": execution_result.get("execution_time_ms", 0),
-            "direction": "buy" if execution_result["units"] > 0 else "sell",
-            "size": abs(execution_result["units"]),
-            "stop_loss": order_data.get("stop_loss"),
-            "take_profit": order_data.get("take_profit"),
-            "strategy_id": order_data.get("strategy_id", "unknown")
-        }
+        units = execution_result["units"]
+        trade = Trade(
+            timestamp_ns=time.time_ns(),
+            instrument=execution_result["instrument"],
+            units=units,
+            fill_price=execution_result["fill_price"],
+            broker=execution_result["broker"],
+            trade_id=execution_result["trade_id"],
+            execution_time_ms=execution_result.get("execution_time_ms", 0),
+            direction="buy" if units > 0 else "sell",
+            size=abs(units),
+            stop_loss=order_data.get("stop_loss"),
+            take_profit=order_data.get("take_profit"),
+            strategy_id=order_data.get("strategy_id", "unknown")
+        )
         
-        # Add to portfolio tracking
-        add_trade(trade_data)
-        log_trade(trade_data)
+        # One dict, formatted once, feeds both the portfolio and the trade log
+        record = trade.to_dict()
+        add_trade(record)
+        log_trade(record)
     
     def get_account_balance(self):
         """Get current account balance"""
@@ -268,7 +350,7 @@ class ExecutionAgent:
             return 1000.0  # Demo balance
         
         try:
-            r = AccountDetails(accountID=self.oanda_account_id)
+            r = self._oanda.AccountDetails(accountID=self.oanda_account_id)
             response = self.oanda_api.request(r)
             balance = float(response["account"]["balance"])
             
@@ -283,24 +365,48 @@ class ExecutionAgent:
     
     def get_execution_stats(self):
         """Get execution statistics"""
-        success_rate = (
-            self.execution_stats["successful_orders"] / max(1, self.execution_stats["total_orders"]) * 100
-        )
-        
+        stats = self.stats
         return {
-            **self.execution_stats,
-            "success_rate": success_rate
+            "total_orders": stats.total_orders,
+            "successful_orders": stats.successful_orders,
+            "failed_orders": stats.failed_orders,
+            "avg_latency": stats.avg_latency(),
+            "fallback_used": stats.fallback_used,
+            "success_rate": stats.success_rate()
         }
     
+    def stream_transactions(self):
+        """Follow OANDA's transaction stream and update equity on each balance change"""
+        # The stream runs on its own thread, so it gets its own client (and requests.Session)
+        # rather than sharing the order and pricing client's
+        stream_api = self._oanda.API(access_token=self.oanda_api_key, environment=self._oanda_environment)
+        while True:
+            try:
+                stream = self._oanda.TransactionsStream(accountID=self.oanda_account_id)
+                for transaction in stream_api.request(stream):
+                    if transaction.get("type") == "HEARTBEAT":
+                        continue
+                    
+                    # ORDER_FILL, DAILY_FINANCING etc. carry the post-transaction balance
+                    balance = transaction.get("accountBalance")
+                    if balance is not None:
+                        update_equity(float(balance))
+                        
+            except Exception as e:
+                log_event("transaction_stream_error", {"error": str(e)})
+                time.sleep(5)  # Back off before reconnecting
+    
     def run(self):
         """Main run loop for the execution agent"""
         log_event("execution_agent_started", {})
         
+        if self.oanda_api:
+            # Push-driven equity updates replace the periodic balance poll
+            self.get_account_balance()
+            threading.Thread(target=self.stream_transactions, daemon=True).start()
+        
         while True:
             try:
-                # Check account balance periodically
-                balance = self.get_account_balance()
-                
                 # Log execution statistics
                 stats = self.get_execution_stats()
                 log_event("execution_stats", stats)
@@ -5,6 +5,7 @@ from agents.market_scanner import MarketScanner
 from agents.risk_kernel import RiskKernel
 from agents.execution_agent import ExecutionAgent
 from datetime import datetime, time
+import asyncio
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,14 +36,35 @@ class FusionAgent:
             fallback_latency=300
         )
         self.london_boost = {"start": time(7, 45), "end": time(8, 0), "multiplier": 1.8}
+        # London window as microseconds since midnight, derived from london_boost, so the
+        # check is plain int math with the same boundaries as comparing times
+        self._london_start_us = self._time_of_day_us(self.london_boost["start"])
+        self._london_end_us = self._time_of_day_us(self.london_boost["end"])
+
+    @staticmethod
+    def _time_of_day_us(t):
+        return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
 
     def is_london_open(self, now):
-        return self.london_boost["start"] <= now.time() <= self.london_boost["end"]
+        return self._london_start_us <= self._time_of_day_us(now) <= self._london_end_us
+
+    def scan(self, pair="EUR/USD"):
+        """Strongest scanner signal for the pair with a trend bias (1 bullish, 0 bearish), or None"""
+        results = [r for r in (self.scanner.scan_pair(pair, tf) for tf in self.scanner.timeframes) if r]
+        trending = [r for r in results if r["market_structure"]["trend"] in ("bullish", "bearish")]
+        if not trending:
+            return None
+        
+        best = max(trending, key=lambda r: r["signal_strength"])
+        return {**best, "bias": 1 if best["market_structure"]["trend"] == "bullish" else 0}
 
-    def execute(self):
+    async def execute(self, pair="EUR/USD"):
         now = datetime.utcnow()
-        scanner_signal = self.scanner.scan()
-        predictor_signal = self.predictor.forecast_direction()
+        # Scanner and predictor are independent, so wait for max(T_scan, T_forecast) not the sum
+        scanner_signal, predictor_signal = await asyncio.gather(
+            asyncio.to_thread(self.scan, pair),
+            asyncio.to_thread(self.predictor.forecast_direction, pair)
+        )
 
         if not scanner_signal or not predictor_signal:
             return
@@ -68,4 +90,4 @@ class FusionAgent:
 
 if __name__ == "__main__":
     agent = FusionAgent()
-    agent.execute()
\ No newline at end of file
+    asyncio.run(agent.execute())
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from utils.alerts import send_critical_alert
 from utils.crypto import send_to_exchange, invest_in_defi_yield_farm, stake_nft_assets
@@ -27,16 +28,20 @@ def profit_cycle(total_profit):
         withdraw_amount = total_profit * WITHDRAW_RATIO
         invest_amount = total_profit - withdraw_amount
 
-        # Step 1: Withdraw portion to exchange
-        send_to_exchange(amount=withdraw_amount, wallet=EXCHANGE_WALLET)
-        log_event("profit_withdrawn", {"amount": float(withdraw_amount), "to": EXCHANGE_WALLET})
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            # Step 1: Withdraw portion to exchange while the DeFi query runs alongside it
+            f_withdraw = ex.submit(send_to_exchange, amount=withdraw_amount, wallet=EXCHANGE_WALLET)
+            # Step 2: Find best DeFi yield or NFT staking option
+            f_best = ex.submit(get_best_yield_opportunity, minimum_amount=invest_amount) if AUTO_COMPOUND else None
 
-        if not AUTO_COMPOUND:
-            log_event("auto_compound_disabled", {})
-            return
+            f_withdraw.result()
+            log_event("profit_withdrawn", {"amount": float(withdraw_amount), "to": EXCHANGE_WALLET})
+
+            if f_best is None:
+                log_event("auto_compound_disabled", {})
+                return
 
-        # Step 2: Find best DeFi yield or NFT staking option
-        best_option = get_best_yield_opportunity(minimum_amount=invest_amount)
+            best_option = f_best.result()
 
         if best_option["type"] == "nft_staking":
             stake_nft_assets(amount=invest_amount, pool=best_option["pool"])
@@ -3,190 +3,236 @@
 import datetime
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 import time
 import os
+import signal
 import sys
+import threading
 from pathlib import Path
 import json
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.utils.logger import log_event
 from utils.alerts import send_system_alert
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Shared numba shim; it points the kernel cache at models/numba_cache before numba loads
+from agents.utils._indicators import NUMBA_AVAILABLE, njit
+
+if not NUMBA_AVAILABLE:
+    print("[WARNING] Numba not available. Pattern kernels will run as plain Python.")
+
+@njit(cache=True, fastmath=True)
+def _fvg_kernel(open_, high, low, close, min_gap_pips):
+    """Scan OHLC arrays for a Fair Value Gap"""
+    # Align prev / current / next candles as shifted slices and test them all at once
+    prev_low, prev_high = low[:-2], high[:-2]
+    next_low, next_high = low[2:], high[2:]
+    body_up = close[1:-1] > open_[1:-1]
+    body_down = close[1:-1] < open_[1:-1]
+    
+    # Bullish FVG: gap between prev low and next high
+    bull = (prev_low > next_high) & body_up & ((prev_low - next_high) * 10000 >= min_gap_pips)
+    
+    # Bearish FVG: gap between prev high and next low
+    bear = (prev_high < next_low) & body_down & ((next_low - prev_high) * 10000 >= min_gap_pips)
+    
+    return bull.any() or bear.any()
+
+@njit(cache=True, fastmath=True)
+def _liquidity_sweep_kernel(high, low, close, lookback):
+    """Check whether the latest candle swept the recent high or low"""
+    recent_high = high[-lookback:].max()
+    recent_low = low[-lookback:].min()
+    
+    if high[-1] > recent_high and close[-1] < recent_high:
+        return True  # Bearish liquidity sweep
+    
+    if low[-1] < recent_low and close[-1] > recent_low:
+        return True  # Bullish liquidity sweep
+    
+    return False
+
+@njit(cache=True, fastmath=True)
+def _adr_kernel(high, low, period):
+    """Mean high-low range over the last period bars"""
+    return (high[-period:] - low[-period:]).mean()
+
+CANDLE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def new_candle_buffer(capacity=128):
+    """Allocate an empty float32 structure-of-arrays candle buffer"""
+    buf = {field: np.zeros(capacity, dtype=np.float32) for field in CANDLE_FIELDS}
+    buf['size'] = 0
+    buf['last_ts'] = np.iinfo(np.int64).min
+    return buf
+
+if NUMBA_AVAILABLE:
+    # Compile once at import so the first scan isn't charged for the JIT
+    _warm = np.ones(32, dtype=np.float32)
+    _fvg_kernel(_warm, _warm, _warm, _warm, 5.0)
+    _liquidity_sweep_kernel(_warm, _warm, _warm, 20)
+    _adr_kernel(_warm, _warm, 14)
+
+@lru_cache(maxsize=64)
+def _synthetic_candles(pair, timeframe, periods, bucket):
+    """Generate demo OHLCV data; bucket only partitions the cache by time window"""
+    rng = np.random.default_rng(hash(pair) & 0xFFFFFFFF)  # Consistent seed per pair
+    
+    dates = pd.date_range(end=datetime.datetime.now(), periods=periods, freq=timeframe)
+    
+    # Generate realistic forex price movements
+    base_price = 1.1000 if pair == "EUR/USD" else 1.0000
+    if "JPY" in pair:
+        base_price = 110.0
+    elif "GBP" in pair:
+        base_price = 1.3000
+    
+    # One float32 block; the columns below are views into it
+    arr = np.empty((periods, 5), dtype=np.float32)
+    open_, high, low, close, volume = (arr[:, i] for i in range(5))
+    
+    # Generate price series with realistic volatility
+    returns = rng.standard_normal(periods, dtype=np.float32)
+    returns *= 0.0008  # Small returns
+    np.cumsum(returns, out=returns)  # Cumulative returns
+    returns += 1
+    np.multiply(returns, base_price, out=close)
+    
+    # Generate OHLC data
+    open_[1:] = close[:-1]
+    open_[0] = close[0]
+    
+    # Add realistic high/low spreads
+    spread = rng.standard_normal(periods, dtype=np.float32)
+    np.abs(spread, out=spread)
+    spread *= 0.0003
+    np.maximum(open_, close, out=high)
+    high += spread
+    np.minimum(open_, close, out=low)
+    low -= spread
+    
+    volume[:] = rng.integers(1000, 10000, periods)
+    
+    data = pd.DataFrame(arr, columns=list(CANDLE_FIELDS), copy=False)
+    data.insert(0, 'timestamp', dates)
+    return data
+
 class MarketDataProvider:
     """Provides market data for scanning"""
     
     def __init__(self):
-        self.data_cache = {}
         self.cache_duration = 300  # 5 minutes
     
     def get_candles(self, pair="EUR/USD", timeframe="1H", periods=100):
         """Get candlestick data for a currency pair"""
-        cache_key = f"{pair}_{timeframe}_{periods}"
-        
-        # Check cache
-        if cache_key in self.data_cache:
-            cached_data, timestamp = self.data_cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
-        
-        # Generate synthetic data for demo
-        np.random.seed(hash(pair) % 2**32)  # Consistent seed per pair
-        
-        dates = pd.date_range(end=datetime.datetime.now(), periods=periods, freq=timeframe)
-        
-        # Generate realistic forex price movements
-        base_price = 1.1000 if pair == "EUR/USD" else 1.0000
-        if "JPY" in pair:
-            base_price = 110.0
-        elif "GBP" in pair:
-            base_price = 1.3000
-        
-        # Generate price series with realistic volatility
-        returns = np.random.normal(0, 0.0008, periods)  # Small returns
-        returns = np.cumsum(returns)  # Cumulative returns
-        
-        close_prices = base_price * (1 + returns)
-        
-        # Generate OHLC data
-        open_prices = np.roll(close_prices, 1)
-        open_prices[0] = close_prices[0]
-        
-        # Add realistic high/low spreads
-        volatility = np.abs(np.random.normal(0, 0.0003, periods))
-        high_prices = np.maximum(open_prices, close_prices) + volatility
-        low_prices = np.minimum(open_prices, close_prices) - volatility
-        
-        volumes = np.random.randint(1000, 10000, periods)
-        
-        data = pd.DataFrame({
-            'timestamp': dates,
-            'open': open_prices,
-            'high': high_prices,
-            'low': low_prices,
-            'close': close_prices,
-            'volume': volumes
-        })
-        
-        # Cache the data
-        self.data_cache[cache_key] = (data, time.time())
-        
-        return data
+        # Calls within the same cache window share one generated frame
+        bucket = int(time.time() // self.cache_duration)
+        return _synthetic_candles(pair, timeframe, periods, bucket)
+    
+    def get_candles_into(self, pair, timeframe, buf, periods=100, df=None):
+        """Append bars newer than the buffer's last bar into its float32 arrays"""
+        if df is None:
+            df = self.get_candles(pair, timeframe, periods)
+        
+        ts = df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        start = int(np.searchsorted(ts, buf['last_ts'], side='right'))
+        capacity = len(buf['close'])
+        start = max(start, len(ts) - capacity)
+        n_new = len(ts) - start
+        if n_new <= 0:
+            return buf
+        
+        size = buf['size']
+        if size + n_new > capacity:
+            # Slide the surviving tail to the front so the window stays contiguous
+            keep = capacity - n_new
+            for field in CANDLE_FIELDS:
+                buf[field][:keep] = buf[field][size - keep:size]
+            size = keep
+        
+        for field in CANDLE_FIELDS:
+            buf[field][size:size + n_new] = df[field].to_numpy()[start:]
+        
+        buf['size'] = size + n_new
+        buf['last_ts'] = int(ts[-1])
+        return buf
+    
+    def get_candles_bulk(self, keys, periods=100):
+        """Get candlestick data for many (pair, timeframe) keys in one call"""
+        return {
+            (pair, timeframe): self.get_candles(pair, timeframe, periods)
+            for pair, timeframe in dict.fromkeys(keys)
+        }
 
 class PatternDetector:
     """Detects trading patterns in market data"""
     
     @staticmethod
-    def detect_fair_value_gap(df, min_gap_pips=5):
+    def detect_fair_value_gap(open_, high, low, close, min_gap_pips=5):
         """Detect Fair Value Gaps (FVG)"""
-        if len(df) < 3:
+        if len(close) < 3:
             return False
         
-        # Look for gaps between candles
-        for i in range(1, len(df) - 1):
-            prev_candle = df.iloc[i-1]
-            current_candle = df.iloc[i]
-            next_candle = df.iloc[i+1]
-            
-            # Bullish FVG: gap between prev low and next high
-            if (prev_candle['low'] > next_candle['high'] and 
-                current_candle['close'] > current_candle['open']):
-                gap_size = (prev_candle['low'] - next_candle['high']) * 10000  # Convert to pips
-                if gap_size >= min_gap_pips:
-                    return True
-            
-            # Bearish FVG: gap between prev high and next low
-            if (prev_candle['high'] < next_candle['low'] and 
-                current_candle['close'] < current_candle['open']):
-                gap_size = (next_candle['low'] - prev_candle['high']) * 10000  # Convert to pips
-                if gap_size >= min_gap_pips:
-                    return True
-        
-        return False
+        return bool(_fvg_kernel(open_, high, low, close, float(min_gap_pips)))
     
     @staticmethod
-    def detect_liquidity_sweep(df, lookback=20):
+    def detect_liquidity_sweep(high, low, close, lookback=20):
         """Detect liquidity sweeps (stop hunts)"""
-        if len(df) < lookback + 5:
+        if len(close) < lookback + 5:
             return False
         
-        recent_data = df.tail(lookback)
-        
-        # Find recent highs and lows
-        recent_high = recent_data['high'].max()
-        recent_low = recent_data['low'].min()
-        
-        latest_candle = df.iloc[-1]
-        
-        # Check if latest candle swept liquidity
-        if latest_candle['high'] > recent_high and latest_candle['close'] < recent_high:
-            return True  # Bearish liquidity sweep
-        
-        if latest_candle['low'] < recent_low and latest_candle['close'] > recent_low:
-            return True  # Bullish liquidity sweep
-        
-        return False
+        return bool(_liquidity_sweep_kernel(high, low, close, int(lookback)))
     
     @staticmethod
-    def detect_order_block(df, lookback=10):
+    def detect_order_block(open_, high, low, close, lookback=10):
         """Detect order blocks (institutional levels)"""
-        if len(df) < lookback + 5:
+        if len(close) < lookback + 5:
             return False
         
-        recent_data = df.tail(lookback)
+        o, h, l, c = open_[-lookback:], high[-lookback:], low[-lookback:], close[-lookback:]
         
         # Look for strong rejection candles
-        for i in range(len(recent_data)):
-            candle = recent_data.iloc[i]
-            body_size = abs(candle['close'] - candle['open'])
-            wick_size = max(
-                candle['high'] - max(candle['open'], candle['close']),
-                min(candle['open'], candle['close']) - candle['low']
-            )
-            
-            # Strong rejection if wick is 2x body size
-            if wick_size > body_size * 2 and body_size > 0:
-                return True
+        body = np.abs(c - o)
+        wick = np.maximum(h - np.maximum(o, c), np.minimum(o, c) - l)
         
-        return False
+        # Strong rejection if wick is 2x body size
+        return bool(np.any((wick > 2 * body) & (body > 0)))
     
     @staticmethod
-    def detect_break_of_structure(df, lookback=20):
+    def detect_break_of_structure(high, low, close, lookback=20):
         """Detect break of market structure"""
-        if len(df) < lookback + 5:
+        if len(close) < lookback + 5:
             return False
         
-        recent_data = df.tail(lookback)
-        
-        # Find swing highs and lows
-        highs = []
-        lows = []
+        high = high[-lookback:]
+        low = low[-lookback:]
         
-        for i in range(2, len(recent_data) - 2):
-            candle = recent_data.iloc[i]
-            
-            # Check if it's a swing high
-            if (candle['high'] > recent_data.iloc[i-1]['high'] and 
-                candle['high'] > recent_data.iloc[i-2]['high'] and
-                candle['high'] > recent_data.iloc[i+1]['high'] and
-                candle['high'] > recent_data.iloc[i+2]['high']):
-                highs.append(candle['high'])
-            
-            # Check if it's a swing low
-            if (candle['low'] < recent_data.iloc[i-1]['low'] and 
-                candle['low'] < recent_data.iloc[i-2]['low'] and
-                candle['low'] < recent_data.iloc[i+1]['low'] and
-                candle['low'] < recent_data.iloc[i+2]['low']):
-                lows.append(candle['low'])
+        # Find swing highs and lows: the center of each 5-candle window vs its neighbours
+        wh = sliding_window_view(high, 5)
+        wl = sliding_window_view(low, 5)
+        highs = wh[:, 2][wh[:, 2] > wh[:, [0, 1, 3, 4]].max(axis=1)]
+        lows = wl[:, 2][wl[:, 2] < wl[:, [0, 1, 3, 4]].min(axis=1)]
         
-        latest_close = df.iloc[-1]['close']
+        latest_close = close[-1]
         
         # Check for break of structure
-        if highs and latest_close > max(highs):
+        if highs.size and latest_close > highs.max():
             return True  # Bullish break of structure
         
-        if lows and latest_close < min(lows):
+        if lows.size and latest_close < lows.min():
             return True  # Bearish break of structure
         
         return False
@@ -199,15 +245,20 @@ class MarketScanner:
         self.timeframes = timeframes or ["15M", "1H", "4H"]
         self.adr_threshold = adr_threshold
         self.last_scan = {}
+        self._buffers = {}
+        self._buffer_capacity = 128
+        self._stop = threading.Event()  # Set by stop() to end run() without waiting out a sleep
         
         # Initialize components
         self.data_provider = MarketDataProvider()
         self.pattern_detector = PatternDetector()
         
-        # Scan results storage
-        self.scan_results = []
-        self.scan_history_file = Path("data/scan_history.json")
+        # Scan results storage, capped at the last 1000; _ts holds matching epoch seconds
+        self.scan_results = deque(maxlen=1000)
+        self._ts = deque(maxlen=1000)
+        self.scan_history_file = Path("data/scan_history.jsonl")
         self.scan_history_file.parent.mkdir(exist_ok=True)
+        self.scan_history_max_bytes = 10 * 1024 * 1024  # Rotate to .1 beyond this
         
         log_event("market_scanner_initialized", {
             "pairs": self.pairs,
@@ -215,84 +266,81 @@ class MarketScanner:
             "adr_threshold": adr_threshold
         })
     
-    def compute_adr(self, df, period=14):
+    def compute_adr(self, high, low, period=14):
         """Compute Average Daily Range"""
-        if len(df) < period:
+        if len(high) < period:
             return 0
         
-        df = df.copy()
-        df['range'] = df['high'] - df['low']
-        adr = df['range'].rolling(window=period).mean().iloc[-1]
-        return adr
-    
-    def compute_volatility_metrics(self, df):
-        """Compute various volatility metrics"""
-        if len(df) < 20:
-            return {}
-        
-        df = df.copy()
-        df['returns'] = df['close'].pct_change()
-        
-        return {
-            "volatility": df['returns'].std(),
-            "atr": self.compute_atr(df),
-            "range_ratio": (df['high'] - df['low']).mean() / df['close'].mean()
-        }
-    
-    def compute_atr(self, df, period=14):
-        """Compute Average True Range"""
-        if len(df) < period + 1:
-            return 0
-        
-        df = df.copy()
-        df['prev_close'] = df['close'].shift(1)
-        
-        df['tr1'] = df['high'] - df['low']
-        df['tr2'] = abs(df['high'] - df['prev_close'])
-        df['tr3'] = abs(df['low'] - df['prev_close'])
-        
-        df['true_range'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
-        atr = df['true_range'].rolling(window=period).mean().iloc[-1]
-        
-        return atr
+        # Only the last window is needed, so skip the rolling Series entirely
+        return float(_adr_kernel(high, low, int(period)))
     
-    def analyze_market_structure(self, df):
-        """Analyze overall market structure"""
-        if len(df) < 50:
-            return {"trend": "unknown", "strength": 0}
-        
-        # Simple trend analysis using moving averages
-        df = df.copy()
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        
-        latest = df.iloc[-1]
-        
-        # Determine trend
-        if latest['close'] > latest['sma_20'] > latest['sma_50']:
-            trend = "bullish"
-            strength = min(1.0, (latest['close'] - latest['sma_50']) / latest['sma_50'] * 100)
-        elif latest['close'] < latest['sma_20'] < latest['sma_50']:
-            trend = "bearish"
-            strength = min(1.0, (latest['sma_50'] - latest['close']) / latest['sma_50'] * 100)
-        else:
-            trend = "sideways"
-            strength = 0.5
+    def _compute_all_metrics(self, high, low, close, period=14):
+        """Compute ATR, volatility, range ratio and trend in one NumPy pass"""
+        n = len(close)
+        metrics = {"market_structure": {"trend": "unknown", "strength": 0}}
+        
+        if n >= 20:
+            returns = np.diff(close) / close[:-1]
+            metrics["volatility"] = returns.std(ddof=1)
+            
+            # ATR only needs the last period true ranges, so build just those
+            if n >= period + 1:
+                h, l = high[-period:], low[-period:]
+                prev_close = close[-period - 1:-1]
+                true_range = np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+                metrics["atr"] = true_range.mean()
+            else:
+                metrics["atr"] = 0
+            metrics["range_ratio"] = (high - low).mean() / close.mean()
+        
+        if n >= 50:
+            # Simple trend analysis using moving averages
+            latest = close[-1]
+            sma_20 = close[-20:].mean()
+            sma_50 = close[-50:].mean()
+            
+            if latest > sma_20 > sma_50:
+                trend = "bullish"
+                strength = min(1.0, (latest - sma_50) / sma_50 * 100)
+            elif latest < sma_20 < sma_50:
+                trend = "bearish"
+                strength = min(1.0, (sma_50 - latest) / sma_50 * 100)
+            else:
+                trend = "sideways"
+                strength = 0.5
+            
+            metrics["market_structure"] = {"trend": trend, "strength": strength}
         
-        return {"trend": trend, "strength": strength}
+        return metrics
     
-    def scan_pair(self, pair, timeframe):
+    def scan_pair(self, pair, timeframe, df=None):
         """Scan a single currency pair for signals"""
         try:
-            # Get market data
-            df = self.data_provider.get_candles(pair, timeframe, periods=100)
+            # Get market data unless the caller already fetched it
+            if df is None:
+                df = self.data_provider.get_candles(pair, timeframe, periods=100)
             if df is None or len(df) < 20:
                 return None
             
-            # Compute metrics
-            adr = self.compute_adr(df)
-            volatility_metrics = self.compute_volatility_metrics(df)
-            market_structure = self.analyze_market_structure(df)
+            # Fold the new bars into this series' float32 buffer
+            buf = self._buffers.get((pair, timeframe))
+            if buf is None:
+                buf = self._buffers[(pair, timeframe)] = new_candle_buffer(self._buffer_capacity)
+            self.data_provider.get_candles_into(pair, timeframe, buf, df=df)
+            
+            # Every detector and metric below reads the same window: the last len(df) bars,
+            # so the buffer's extra capacity never widens the lookback past what was fetched
+            size = buf['size']
+            window = slice(max(0, size - len(df)), size)
+            open_, high = buf['open'][window], buf['high'][window]
+            low, close = buf['low'][window], buf['close'][window]
+            
+            # Compute metrics; the statistics accumulate in float64
+            adr = self.compute_adr(high, low)
+            volatility_metrics = self._compute_all_metrics(
+                high.astype(np.float64), low.astype(np.float64), close.astype(np.float64)
+            )
+            market_structure = volatility_metrics["market_structure"]
             
             # Check if market is active enough
             if adr < self.adr_threshold:
@@ -308,19 +356,19 @@ class MarketScanner:
             signals = []
             signal_strength = 0
             
-            if self.pattern_detector.detect_fair_value_gap(df):
+            if self.pattern_detector.detect_fair_value_gap(open_, high, low, close):
                 signals.append("FVG")
                 signal_strength += 0.3
             
-            if self.pattern_detector.detect_liquidity_sweep(df):
+            if self.pattern_detector.detect_liquidity_sweep(high, low, close):
                 signals.append("LiquiditySweep")
                 signal_strength += 0.4
             
-            if self.pattern_detector.detect_order_block(df):
+            if self.pattern_detector.detect_order_block(open_, high, low, close):
                 signals.append("OrderBlock")
                 signal_strength += 0.2
             
-            if self.pattern_detector.detect_break_of_structure(df):
+            if self.pattern_detector.detect_break_of_structure(high, low, close):
                 signals.append("BreakOfStructure")
                 signal_strength += 0.5
             
@@ -336,7 +384,7 @@ class MarketScanner:
                     "atr": volatility_metrics.get("atr", 0),
                     "market_structure": market_structure,
                     "timestamp": datetime.datetime.utcnow().isoformat(),
-                    "current_price": df.iloc[-1]['close']
+                    "current_price": float(close[-1])
                 }
                 
                 log_event("market_signal_detected", result)
@@ -364,38 +412,57 @@ class MarketScanner:
         """Scan all configured pairs and timeframes"""
         results = []
         
-        for pair in self.pairs:
-            for timeframe in self.timeframes:
-                # Check if we've scanned this recently
-                scan_key = f"{pair}_{timeframe}"
-                last_scan_time = self.last_scan.get(scan_key, 0)
-                
-                # Skip if scanned within last 15 minutes
-                if time.time() - last_scan_time < 900:
-                    continue
-                
-                result = self.scan_pair(pair, timeframe)
-                if result:
-                    results.append(result)
-                
-                self.last_scan[scan_key] = time.time()
+        # Skip anything scanned within the last 15 minutes
+        now = time.time()
+        todo = [
+            (pair, timeframe)
+            for pair in self.pairs
+            for timeframe in self.timeframes
+            if now - self.last_scan.get((pair, timeframe), 0) >= 900
+        ]
+        
+        # Fetch every due series up front, then run the pure-compute scans
+        candles = self.data_provider.get_candles_bulk(todo, periods=100)
+        
+        if todo:
+            # Scans are independent; NumPy kernels release the GIL for much of the work
+            with ThreadPoolExecutor(max_workers=min(12, len(todo))) as executor:
+                futures = {
+                    executor.submit(self.scan_pair, pair, timeframe, candles.get((pair, timeframe))): (pair, timeframe)
+                    for pair, timeframe in todo
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result:
+                        results.append(result)
+                    
+                    self.last_scan[futures[future]] = now
         
         # Store results
         if results:
             self.scan_results.extend(results)
-            self._save_scan_history()
+            self._ts.extend([time.time()] * len(results))
+            self._save_scan_history(results)
         
         return results
     
-    def _save_scan_history(self):
-        """Save scan history to file"""
+    def _save_scan_history(self, new_results):
+        """Append new scan results to the JSONL history file"""
         try:
-            # Keep only last 1000 results
-            if len(self.scan_results) > 1000:
-                self.scan_results = self.scan_results[-1000:]
+            if ORJSON_AVAILABLE:
+                payload = b"".join(
+                    orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n" for r in new_results
+                )
+            else:
+                payload = "".join(json.dumps(r) + "\n" for r in new_results).encode()
             
-            with open(self.scan_history_file, 'w') as f:
-                json.dump(self.scan_results, f, indent=2)
+            # Only the new records are written; the file is rotated rather than rewritten
+            if (self.scan_history_file.exists() and
+                    self.scan_history_file.stat().st_size > self.scan_history_max_bytes):
+                os.replace(self.scan_history_file, self.scan_history_file.with_name(self.scan_history_file.name + ".1"))
+            
+            with open(self.scan_history_file, 'ab') as f:
+                f.write(payload)
                 
         except Exception as e:
             log_event("scan_history_save_error", {"error": str(e)})
@@ -405,11 +472,9 @@ class MarketScanner:
         if not self.scan_results:
             return {"total_signals": 0, "pairs_scanned": 0, "last_scan": None}
         
-        recent_scans = [
-            s for s in self.scan_results 
-            if datetime.datetime.fromisoformat(s["timestamp"]) > 
-               datetime.datetime.utcnow() - datetime.timedelta(hours=24)
-        ]
+        # Results are appended in time order, so the 24h cutoff is a binary search
+        cutoff = bisect_left(self._ts, time.time() - 86400)
+        recent_scans = list(islice(self.scan_results, cutoff, None))
         
         return {
             "total_signals": len(recent_scans),
@@ -421,12 +486,17 @@ class MarketScanner:
             "last_scan": recent_scans[-1]["timestamp"] if recent_scans else None
         }
     
-    def run(self):
+    def stop(self):
+        """Ask the run loop to exit at its next wait"""
+        self._stop.set()
+    
+    def run(self, interval=600, retry_delay=300):
         """Main run loop for market scanner"""
         log_event("market_scanner_started", {})
         send_system_alert("Market Scanner started")
         
-        while True:
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
             try:
                 # Scan all pairs
                 results = self.scan_all_pairs()
@@ -438,13 +508,18 @@ class MarketScanner:
                     "summary": summary
                 })
                 
-                # Sleep for 10 minutes
-                time.sleep(600)
+                # Next cycle 10 minutes after this one started, not after it finished;
+                # a cycle that overran skips the missed ticks instead of running back to back
+                next_tick = max(next_tick + interval, time.monotonic())
                 
             except Exception as e:
                 log_event("market_scanner_error", {"error": str(e)})
                 send_system_alert(f"Market Scanner error: {str(e)}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+                next_tick = time.monotonic() + retry_delay  # Wait 5 minutes before retrying
+            
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+        
+        log_event("market_scanner_stopped", {})
 
 if __name__ == "__main__":
     scanner = MarketScanner(
@@ -460,5 +535,7 @@ if __name__ == "__main__":
     for result in results:
         print(f"Signal: {result['pair']} - {result['signals']} (strength: {result['signal_strength']:.2f})")
     
-    # Start main loop
+    # Start main loop; SIGINT/SIGTERM end it at the next wait
+    signal.signal(signal.SIGINT, lambda signum, frame: scanner.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: scanner.stop())
     scanner.run()
\ No newline at end of file
@@ -5,10 +5,50 @@ import pickle
 import os
 from pathlib import Path
 
+# Shared numba shim; it points the kernel cache at models/numba_cache before numba loads
+from agents.utils._indicators import NUMBA_AVAILABLE, njit
+
+if not NUMBA_AVAILABLE:
+    print("[WARNING] Numba not available. Q-Network will use the NumPy training path.")
+
+@njit(cache=True, fastmath=True)
+def _forward_kernel(x, W0, b0, W1, b1, W2, b2):
+    """Two ReLU hidden layers and a linear output, fused"""
+    a1 = np.maximum(x @ W0 + b0, 0.0)
+    a2 = np.maximum(a1 @ W1 + b1, 0.0)
+    return a1, a2, a2 @ W2 + b2
+
+@njit(cache=True, fastmath=True)
+def _train_step_kernel(states, actions, rewards, next_states, gamma, lr, W0, b0, W1, b1, W2, b2):
+    """Q-learning update over a batch of transitions, applied to the weights in place"""
+    a1, a2, q = _forward_kernel(states, W0, b0, W1, b1, W2, b2)
+    _, _, next_q = _forward_kernel(next_states, W0, b0, W1, b1, W2, b2)
+    
+    # Target equals the current estimate except at the taken action
+    target = q.copy()
+    for i in range(q.shape[0]):
+        target[i, actions[i]] = rewards[i] + gamma * next_q[i].max()
+    
+    # Backpropagate; ReLU derivative is 1 where the activation is positive
+    e2 = q - target
+    e1 = (e2 @ W2.T) * (a2 > 0.0).astype(np.float64)
+    e0 = (e1 @ W1.T) * (a1 > 0.0).astype(np.float64)
+    
+    n = q.shape[0]
+    W2 -= lr * (a2.T @ e2)
+    b2 -= lr * (e2.sum(axis=0) / n).reshape(1, -1)
+    W1 -= lr * (a1.T @ e1)
+    b1 -= lr * (e1.sum(axis=0) / n).reshape(1, -1)
+    W0 -= lr * (states.T @ e0)
+    b0 -= lr * (e0.sum(axis=0) / n).reshape(1, -1)
+
 class DeepQNetwork:
     """Simple Deep Q-Network implementation using numpy"""
     
-    def __init__(self, input_dim, output_dim, hidden_dims=[64, 32], learning_rate=0.001):
+    # Fused kernels cover the default two-hidden-layer shape only
+    use_numba = NUMBA_AVAILABLE
+    
+    def __init__(self, input_dim, output_dim, hidden_dims=[64, 32], learning_rate=0.001, rng=None):
         self.input_dim = input_dim
         self.output_dim = output_dim
         self.hidden_dims = hidden_dims
@@ -26,12 +66,23 @@ class DeepQNetwork:
             self.weights.append(w)
             self.biases.append(b)
         
-        # Experience replay buffer
-        self.memory = []
+        # Experience replay ring buffer: one row per transition, write head wraps around
         self.memory_size = 10000
+        self.S = np.empty((self.memory_size, input_dim), dtype=np.float32)
+        self.A = np.empty(self.memory_size, dtype=np.int64)
+        self.R = np.empty(self.memory_size, dtype=np.float32)
+        self.NS = np.empty((self.memory_size, input_dim), dtype=np.float32)
+        self._mem_head = 0
+        self._mem_count = 0
+        # Replay sampling; seeded from np.random unless a Generator or seed is given
+        self._rng = np.random.default_rng(np.random.randint(2**31) if rng is None else rng)
+        
+        # Forward-pass scratch arrays keyed by batch rows (1 online, 32 replay)
+        self._workspaces = {}
         
         # Model save path
-        self.model_path = Path("models/q_network.pkl")
+        self.model_path = Path("models/q_network.npz")
+        self.legacy_model_path = Path("models/q_network.pkl")  # Read once if no .npz exists yet
         self.model_path.parent.mkdir(exist_ok=True)
         
         # Load existing model if available
@@ -45,23 +96,31 @@ class DeepQNetwork:
         """Derivative of ReLU"""
         return (x > 0).astype(float)
     
+    def _workspace(self, rows):
+        """Preallocated z / activation buffers for a batch of the given size"""
+        ws = self._workspaces.get(rows)
+        if ws is None:
+            z_buf = [np.empty((rows, w.shape[1])) for w in self.weights]
+            # Hidden activations get their own arrays; the linear output reuses its z buffer
+            a_buf = [np.empty_like(z) for z in z_buf[:-1]] + [z_buf[-1]]
+            ws = self._workspaces[rows] = (z_buf, a_buf)
+        return ws
+    
     def forward(self, x):
-        """Forward pass through the network"""
+        """Forward pass through the network (results live in reused buffers)"""
         if x.ndim == 1:
             x = x.reshape(1, -1)
         
-        activations = [x]
-        z_values = []
+        z_values, a_buf = self._workspace(x.shape[0])
+        activations = [x] + a_buf
         
         for i, (w, b) in enumerate(zip(self.weights, self.biases)):
-            z = np.dot(activations[-1], w) + b
-            z_values.append(z)
+            z = z_values[i]
+            np.dot(activations[i], w, out=z)
+            np.add(z, b, out=z)
             
             if i < len(self.weights) - 1:  # Hidden layers
-                a = self.relu(z)
-            else:  # Output layer (linear)
-                a = z
-            activations.append(a)
+                np.maximum(z, 0, out=activations[i + 1])
         
         return activations, z_values
     
@@ -74,37 +133,71 @@ class DeepQNetwork:
     def get_q_values(self, state):
         """Get Q-values for a given state"""
         activations, _ = self.forward(state)
-        return activations[-1][0]
+        return activations[-1][0].copy()
     
     def train(self, state, action, reward, next_state, gamma=0.99):
         """Train the network using Q-learning"""
         # Add experience to memory
-        experience = (state, action, reward, next_state)
-        self.memory.append(experience)
-        
-        if len(self.memory) > self.memory_size:
-            self.memory.pop(0)
+        self._remember(state, action, reward, next_state)
         
         # Train on current experience
         self._train_step(state, action, reward, next_state, gamma)
         
         # Occasionally train on random batch from memory
-        if len(self.memory) > 32 and np.random.random() < 0.1:
-            batch = np.random.choice(len(self.memory), size=min(32, len(self.memory)), replace=False)
-            for idx in batch:
-                s, a, r, ns = self.memory[idx]
-                self._train_step(s, a, r, ns, gamma)
+        if self._mem_count > 32 and self._rng.random() < 0.1:
+            idx = self._rng.choice(self._mem_count, size=32, replace=False)
+            self._train_batch(self.S[idx], self.A[idx], self.R[idx], self.NS[idx], gamma)
+    
+    def _remember(self, state, action, reward, next_state):
+        """Write one transition at the ring buffer head"""
+        i = self._mem_head
+        self.S[i] = state
+        self.A[i] = action
+        self.R[i] = reward
+        self.NS[i] = next_state
+        self._mem_head = (i + 1) % self.memory_size
+        self._mem_count = min(self._mem_count + 1, self.memory_size)
+    
+    def _recent_memory(self, n):
+        """Last n transitions, oldest first, as (state, action, reward, next_state) tuples"""
+        n = min(n, self._mem_count)
+        idx = (self._mem_head - n + np.arange(n)) % self.memory_size
+        return [(self.S[i], int(self.A[i]), float(self.R[i]), self.NS[i]) for i in idx]
     
     def _train_step(self, state, action, reward, next_state, gamma):
         """Single training step"""
-        # Forward pass for current state
-        activations, z_values = self.forward(state)
-        current_q = activations[-1][0]
+        self._train_batch(
+            np.reshape(state, (1, -1)), np.array([action]),
+            np.array([reward]), np.reshape(next_state, (1, -1)), gamma
+        )
+    
+    def _train_batch(self, states, actions, rewards, next_states, gamma):
+        """One Q-learning update over a stacked batch of transitions"""
+        states = np.ascontiguousarray(states, dtype=np.float64)
+        next_states = np.ascontiguousarray(next_states, dtype=np.float64)
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
         
-        # Calculate target Q-value
-        next_q_values = self.get_q_values(next_state)
-        target_q = current_q.copy()
-        target_q[action] = reward + gamma * np.max(next_q_values)
+        if self.use_numba and len(self.weights) == 3:
+            W0, W1, W2 = self.weights
+            b0, b1, b2 = self.biases
+            _train_step_kernel(
+                states, actions, rewards, next_states,
+                float(gamma), float(self.learning_rate),
+                W0, b0, W1, b1, W2, b2
+            )
+            return
+        
+        # Next-state values first: both passes share the same workspace buffers
+        next_q_values, _ = self.forward(next_states)
+        next_q_max = next_q_values[-1].max(axis=1)
+        
+        # Forward pass for current states
+        activations, z_values = self.forward(states)
+        
+        # Calculate target Q-values
+        target_q = activations[-1].copy()
+        target_q[np.arange(len(actions)), actions] = rewards + gamma * next_q_max
         
         # Backward pass
         self._backward(activations, z_values, target_q)
@@ -112,7 +205,7 @@ class DeepQNetwork:
     def _backward(self, activations, z_values, target):
         """Backward pass to update weights"""
         # Calculate output layer error
-        output_error = activations[-1] - target.reshape(1, -1)
+        output_error = activations[-1] - target.reshape(activations[-1].shape)
         
         # Backpropagate errors
         errors = [output_error]
@@ -127,32 +220,59 @@ class DeepQNetwork:
     
     def save_model(self):
         """Save the model to disk"""
-        model_data = {
-            'weights': self.weights,
-            'biases': self.biases,
-            'memory': self.memory[-1000:],  # Save last 1000 experiences
-            'input_dim': self.input_dim,
-            'output_dim': self.output_dim,
-            'hidden_dims': self.hidden_dims
-        }
-        
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(model_data, f)
+        arrays = {f'w{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        
+        # Last 1000 experiences as one float32 matrix: [state | action | reward | next_state]
+        n = min(1000, self._mem_count)
+        idx = (self._mem_head - n + np.arange(n)) % self.memory_size
+        arrays['memory'] = np.hstack([
+            self.S[idx], self.A[idx, None].astype(np.float32),
+            self.R[idx, None], self.NS[idx]
+        ])
+        
+        np.savez_compressed(
+            self.model_path, **arrays,
+            dims=np.array([self.input_dim] + list(self.hidden_dims) + [self.output_dim])
+        )
     
     def load_model(self):
         """Load the model from disk"""
         if self.model_path.exists():
             try:
-                with open(self.model_path, 'rb') as f:
-                    model_data = pickle.load(f)
+                with np.load(self.model_path) as z:
+                    n_layers = len(z['dims']) - 1
+                    # Contiguous float64 so the fused kernels can update them in place
+                    self.weights = [np.ascontiguousarray(z[f'w{i}'], dtype=np.float64) for i in range(n_layers)]
+                    self.biases = [np.ascontiguousarray(z[f'b{i}'], dtype=np.float64) for i in range(n_layers)]
+                    memory = z['memory']
                 
-                self.weights = model_data['weights']
-                self.biases = model_data['biases']
-                self.memory = model_data.get('memory', [])
+                d = self.input_dim
+                n = len(memory)
+                self.S[:n] = memory[:, :d]
+                self.A[:n] = memory[:, d].astype(np.int64)
+                self.R[:n] = memory[:, d + 1]
+                self.NS[:n] = memory[:, d + 2:]
+                self._mem_head = n % self.memory_size
+                self._mem_count = n
                 
                 print(f"[Q-Network] Loaded model from {self.model_path}")
             except Exception as e:
                 print(f"[Q-Network] Failed to load model: {e}")
+        
+        elif self.legacy_model_path.exists():
+            try:
+                with open(self.legacy_model_path, 'rb') as f:
+                    model_data = pickle.load(f)
+                
+                self.weights = [np.ascontiguousarray(w, dtype=np.float64) for w in model_data['weights']]
+                self.biases = [np.ascontiguousarray(b, dtype=np.float64) for b in model_data['biases']]
+                for experience in model_data.get('memory', []):
+                    self._remember(*experience)
+                
+                print(f"[Q-Network] Loaded legacy model from {self.legacy_model_path}")
+            except Exception as e:
+                print(f"[Q-Network] Failed to load model: {e}")
     
     def __del__(self):
         """Save model when object is destroyed"""
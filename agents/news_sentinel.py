@@ -1,47 +1,95 @@
 # agents/news_sentinel.py
 
 import datetime
+import json
+import re
 import requests
+from requests.adapters import HTTPAdapter
 from utils.alerts import send_alert
 from core.utils.trading_halt import TradingHaltManager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+NEWS_URL = "https://api.forexfactory.com/calendar/today"
+
 class NewsSentinel:
     def __init__(self, blackout_rules):
         self.blackout_rules = blackout_rules
+        # Lower-cased keywords with their blackout windows as ready-made timedeltas
+        self._windows = {}
+        for keyword, blackout in blackout_rules.items():
+            self._windows.setdefault(keyword.lower(), []).append((
+                datetime.timedelta(hours=blackout.get("pre", 0)),
+                datetime.timedelta(hours=blackout.get("post", 0))
+            ))
+        # One pass over each title finds every keyword; the lookahead lets matches overlap.
+        # The alternation reports only the longest keyword at a position, so each keyword
+        # also carries the shorter keywords it starts with ("cpi m/m" -> "cpi m/m", "cpi").
+        self._keyword_re = re.compile(
+            "(?=(" + "|".join(re.escape(k) for k in sorted(self._windows, key=len, reverse=True)) + "))"
+        ) if self._windows else None
+        self._prefix_keywords = {
+            keyword: [k for k in self._windows if keyword.startswith(k)] for keyword in self._windows
+        }
         self.trading_halt = TradingHaltManager()
 
+        # Keep-alive session plus validators so unchanged calendars come back as 304
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=4, pool_block=False))
+        self._etag = None
+        self._last_modified = None
+        self._events = []
+
     def fetch_news_events(self):
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
         try:
-            response = requests.get("https://api.forexfactory.com/calendar/today")
-            return response.json()  # Assume the API returns JSON news events
+            response = self._session.get(NEWS_URL, headers=headers, timeout=10)
+            if response.status_code == 304:
+                return self._events
+
+            # Assume the API returns JSON news events
+            self._events = orjson.loads(response.content) if ORJSON_AVAILABLE else json.loads(response.content)
+            self._etag = response.headers.get("ETag")
+            self._last_modified = response.headers.get("Last-Modified")
+            return self._events
         except Exception as e:
             send_alert(f"🛑 Failed to fetch news events: {str(e)}")
             return []
 
-    def evaluate_news(self, news_event):
+    def evaluate_news(self, news_event, now=None):
         title = news_event.get("title", "").lower()
         time_str = news_event.get("time")
         if not time_str:
             return False
 
-        event_time = datetime.datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%SZ")
-        now = datetime.datetime.utcnow()
+        event_time = datetime.datetime.fromisoformat(time_str[:-1] if time_str.endswith("Z") else time_str)
+        if now is None:
+            now = datetime.datetime.utcnow()
 
-        for keyword, blackout in self.blackout_rules.items():
-            if keyword.lower() in title:
-                pre_hours = blackout.get("pre", 0)
-                post_hours = blackout.get("post", 0)
-                pre_window = event_time - datetime.timedelta(hours=pre_hours)
-                post_window = event_time + datetime.timedelta(hours=post_hours)
+        if self._keyword_re is None:
+            return False
 
-                if pre_window <= now <= post_window:
+        matched = {k for m in self._keyword_re.finditer(title) for k in self._prefix_keywords[m.group(1)]}
+        for keyword in matched:
+            for pre_delta, post_delta in self._windows[keyword]:
+                if event_time - pre_delta <= now <= event_time + post_delta:
                     return True
         return False
 
     def run(self):
         news_events = self.fetch_news_events()
+        now = datetime.datetime.utcnow()
         for event in news_events:
-            if self.evaluate_news(event):
+            if self.evaluate_news(event, now):
                 self.trading_halt.activate(reason=event.get("title", "Unknown Event"))
                 send_alert(f"⚠️ Trading halted due to event: {event.get('title')}")
                 return
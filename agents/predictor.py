@@ -5,23 +5,29 @@ import numpy as np
 import time
 import os
 import sys
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 import pickle
 import json
+import sqlite3
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.utils.logger import log_event
+from agents.utils._indicators import compute_ema_macd, compute_indicators, pct_change
 from utils.alerts import send_system_alert
 
 try:
-    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
     from sklearn.linear_model import LogisticRegression
     from sklearn.preprocessing import StandardScaler
     from sklearn.model_selection import train_test_split
     from sklearn.metrics import accuracy_score, classification_report
+    import joblib
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
@@ -34,107 +40,131 @@ except ImportError:
     LIGHTGBM_AVAILABLE = False
     print("[WARNING] LightGBM not available. Install for advanced ML predictions.")
 
+# Fixed bar widths for the common timeframes, so timestamps skip pandas offset parsing
+_TIMEFRAME_STEPS = {
+    '1H': np.timedelta64(1, 'h'),
+    '4H': np.timedelta64(4, 'h'),
+    '1D': np.timedelta64(1, 'D'),
+}
+
+@lru_cache(maxsize=64)
+def _synthetic_forex(pair, timeframe, periods, bucket):
+    """Generate demo price arrays; bucket only partitions the cache by time window"""
+    rng = np.random.default_rng(42)  # For reproducible demo data, without touching global state
+    
+    step = _TIMEFRAME_STEPS.get(timeframe)
+    if step is not None:
+        dates = np.datetime64(datetime.now(), 'ns') - np.arange(periods - 1, -1, -1, dtype=np.int64) * step
+    else:
+        dates = pd.date_range(end=datetime.now(), periods=periods, freq=timeframe).values
+    
+    # One float32 draw: column 0 drives returns, columns 1-2 the high/low wicks
+    noise = rng.standard_normal((periods, 3), dtype=np.float32)
+    np.abs(noise[:, 1:], out=noise[:, 1:])
+    noise *= np.array([0.001, 0.0005, -0.0005], dtype=np.float32)  # Small daily returns / intraday volatility
+    
+    # Generate realistic forex price movements
+    base_price = 1.1000 if pair == "EUR/USD" else 1.0000
+    prices = np.cumsum(noise[:, 0])  # Cumulative returns
+    prices += 1
+    prices *= base_price
+    
+    # Add some intraday volatility
+    high = (noise[:, 1] + 1) * prices
+    low = (noise[:, 2] + 1) * prices
+    volume = rng.integers(1000, 10000, periods)
+    
+    # Shared by every caller in the window, so freeze them
+    arrays = (dates, prices, high, low, volume)
+    for arr in arrays:
+        arr.flags.writeable = False
+    return arrays
+
 class MarketDataProvider:
     """Provides market data and indicators"""
     
     def __init__(self):
-        self.data_cache = {}
         self.cache_duration = 300  # 5 minutes
+        self._rng = np.random.default_rng()  # One Generator for the simulated VIX/macro feeds
     
     def get_forex_data(self, pair="EUR/USD", timeframe="1H", periods=100):
         """Get forex price data (simulated for demo)"""
-        cache_key = f"{pair}_{timeframe}_{periods}"
+        # Calls within the same cache window share one set of generated arrays
+        bucket = int(time.time() // self.cache_duration)
+        dates, prices, high, low, volume = _synthetic_forex(pair, timeframe, periods, bucket)
         
-        # Check cache
-        if cache_key in self.data_cache:
-            cached_data, timestamp = self.data_cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
-        
-        # Generate synthetic data for demo
-        np.random.seed(42)  # For reproducible demo data
-        
-        dates = pd.date_range(end=datetime.now(), periods=periods, freq=timeframe)
-        
-        # Generate realistic forex price movements
-        base_price = 1.1000 if pair == "EUR/USD" else 1.0000
-        returns = np.random.normal(0, 0.001, periods)  # Small daily returns
-        returns = np.cumsum(returns)  # Cumulative returns
-        
-        prices = base_price * (1 + returns)
-        
-        # Add some intraday volatility
-        high = prices * (1 + np.abs(np.random.normal(0, 0.0005, periods)))
-        low = prices * (1 - np.abs(np.random.normal(0, 0.0005, periods)))
-        
-        data = pd.DataFrame({
+        # A fresh frame per call, so callers are free to modify it
+        return pd.DataFrame({
             'timestamp': dates,
             'open': prices,
             'high': high,
             'low': low,
             'close': prices,
-            'volume': np.random.randint(1000, 10000, periods)
+            'volume': volume
         })
-        
-        # Cache the data
-        self.data_cache[cache_key] = (data, time.time())
-        
-        return data
     
     def calculate_technical_indicators(self, data):
         """Calculate technical indicators"""
-        df = data.copy()
-        
-        # Moving averages
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        bb_std = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-        
-        # Volatility
-        df['volatility'] = df['close'].pct_change().rolling(window=20).std()
-        
-        # Price momentum
-        df['momentum_5'] = df['close'].pct_change(5)
-        df['momentum_10'] = df['close'].pct_change(10)
-        
-        # Volume indicators
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_sma']
-        
-        return df
+        close = data['close'].to_numpy(np.float64)
+        volume = data['volume'].to_numpy(np.float64)
+        
+        # Window indicators (SMAs, RSI, Bollinger, volume SMA) in one pass over the raw arrays
+        sma_20, sma_50, bb_upper, bb_lower, rsi, volume_sma = compute_indicators(close, volume)
+        ema_12, ema_26, macd, macd_signal, macd_histogram = compute_ema_macd(close)
+        returns = pct_change(close)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indicators = {
+                # Moving averages
+                'sma_20': sma_20,
+                'sma_50': sma_50,
+                'ema_12': ema_12,
+                'ema_26': ema_26,
+                
+                # MACD
+                'macd': macd,
+                'macd_signal': macd_signal,
+                'macd_histogram': macd_histogram,
+                
+                # RSI
+                'rsi': rsi,
+                
+                # Bollinger Bands
+                'bb_middle': sma_20,
+                'bb_upper': bb_upper,
+                'bb_lower': bb_lower,
+                'bb_position': (close - bb_lower) / (bb_upper - bb_lower),
+                
+                # Volatility
+                'volatility': pd.Series(returns).rolling(window=20).std().to_numpy(),
+                
+                # Price momentum
+                'momentum_5': pct_change(close, 5),
+                'momentum_10': pct_change(close, 10),
+                
+                # Volume indicators
+                'volume_sma': volume_sma,
+                'volume_ratio': volume / volume_sma,
+            }
+        
+        # One new frame alongside the input columns; the input itself is left untouched
+        return pd.concat([data, pd.DataFrame(indicators, index=data.index)], axis=1, copy=False)
     
     def get_vix_data(self):
         """Get VIX data (simulated)"""
         # Simulate VIX data
-        return np.random.uniform(15, 35)  # Typical VIX range
+        return self._rng.uniform(15, 35)  # Typical VIX range
     
     def get_economic_indicators(self):
         """Get economic indicators (simulated)"""
+        usd_index, yield_spread, oil_price, gold_price = self._rng.uniform(
+            (95, 1.5, 60, 1800), (105, 3.0, 80, 2000)
+        )
         return {
-            'usd_index': np.random.uniform(95, 105),
-            'yield_spread': np.random.uniform(1.5, 3.0),
-            'oil_price': np.random.uniform(60, 80),
-            'gold_price': np.random.uniform(1800, 2000)
+            'usd_index': usd_index,
+            'yield_spread': yield_spread,
+            'oil_price': oil_price,
+            'gold_price': gold_price
         }
 
 class PredictionModel:
@@ -143,12 +173,20 @@ class PredictionModel:
     def __init__(self, model_type="lightgbm"):
         self.model_type = model_type
         self.model = None
-        self.scaler = StandardScaler() if SKLEARN_AVAILABLE else None
+        self._mean = None  # Fitted scaler parameters as float32, for the inline z-score in predict
+        self._inv_scale = None
         self.feature_names = []
-        self.model_path = Path("models/predictor_model.pkl")
+        self._last_fp = None  # Fingerprint of the data the model was last fitted on
+        self._feature_cache = {}  # (rows, last timestamp, last close, last volume) -> prepared frame
+        self._feature_cache_size = 8
+        # One metadata file per model type; the arrays and model files sit beside it
+        self.model_path = Path(f"models/predictor_{model_type}.json")
+        self.legacy_model_path = Path("models/predictor_model.pkl")  # Read once if no .json exists yet
         self.model_path.parent.mkdir(exist_ok=True)
         
         self.initialize_model()
+        # Tree splits are scale-invariant, so only the linear model gets a scaler
+        self.scaler = StandardScaler() if SKLEARN_AVAILABLE and isinstance(self.model, LogisticRegression) else None
         self.load_model()
     
     def initialize_model(self):
@@ -164,7 +202,8 @@ class PredictionModel:
             if self.model_type == "random_forest":
                 self.model = RandomForestClassifier(n_estimators=100, random_state=42)
             elif self.model_type == "gradient_boosting":
-                self.model = GradientBoostingClassifier(n_estimators=100, random_state=42)
+                # Histogram-binned boosting; same fit/predict API as the exact-split version
+                self.model = HistGradientBoostingClassifier(max_iter=100, early_stopping=False, random_state=42)
             else:
                 self.model = LogisticRegression(random_state=42)
         else:
@@ -173,7 +212,15 @@ class PredictionModel:
     
     def prepare_features(self, data):
         """Prepare features for ML model"""
-        df = data.copy()
+        # Repeat calls on the same bars (predict after train, every forecast in a cache window) reuse the frame
+        key = None
+        if len(data):
+            last = data.iloc[-1]
+            key = (len(data), pd.Timestamp(last['timestamp']).value, float(last['close']), float(last['volume']))
+            cached = self._feature_cache.get(key)
+            if cached is not None:
+                self.feature_names = list(cached.columns[:-1])
+                return cached
         
         # Technical indicator features
         features = [
@@ -182,27 +229,43 @@ class PredictionModel:
             'rsi', 'bb_position', 'volatility',
             'momentum_5', 'momentum_10', 'volume_ratio'
         ]
-        
-        # Add time-based features
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.dayofweek
-        df['is_london_session'] = ((df['hour'] >= 8) & (df['hour'] <= 16)).astype(int)
-        df['is_ny_session'] = ((df['hour'] >= 13) & (df['hour'] <= 21)).astype(int)
-        
-        features.extend(['hour', 'day_of_week', 'is_london_session', 'is_ny_session'])
+        indicators = data[features]
+        close = data['close']
+        volume = data['volume']
+        
+        # Add time-based features from whole hours since the epoch (1970-01-01 was a Thursday, dayofweek 3)
+        hours = data['timestamp'].to_numpy().astype('datetime64[h]').astype(np.int64)
+        hour = hours % 24
+        derived = {
+            'hour': hour,
+            'day_of_week': (hours // 24 + 3) % 7,
+            'is_london_session': ((hour >= 8) & (hour <= 16)).astype(np.int8),
+            'is_ny_session': ((hour >= 13) & (hour <= 21)).astype(np.int8),
+        }
         
         # Add lagged features
         for lag in [1, 2, 3]:
-            df[f'close_lag_{lag}'] = df['close'].shift(lag)
-            df[f'volume_lag_{lag}'] = df['volume'].shift(lag)
-            features.extend([f'close_lag_{lag}', f'volume_lag_{lag}'])
+            derived[f'close_lag_{lag}'] = close.shift(lag)
+            derived[f'volume_lag_{lag}'] = volume.shift(lag)
+        
+        features.extend(derived)
         
-        # Create target variable (1 if price goes up, 0 if down)
-        df['future_return'] = df['close'].shift(-1) / df['close'] - 1
-        df['target'] = (df['future_return'] > 0).astype(int)
+        # Create target variable (1 if price goes up, 0 if down); the last bar has no future and stays 0
+        target = np.zeros(len(close), dtype=np.int8)
+        target[:-1] = np.diff(close.to_numpy()) > 0
+        derived['target'] = target
+        
+        # Assemble once, without copying the indicator columns or the input frame
+        df = pd.concat([indicators, pd.DataFrame(derived, index=data.index)], axis=1, copy=False)
         
         self.feature_names = features
-        return df[features + ['target']].dropna()
+        prepared = df.dropna()
+        
+        if key is not None:
+            if len(self._feature_cache) >= self._feature_cache_size:
+                self._feature_cache.pop(next(iter(self._feature_cache)))
+            self._feature_cache[key] = prepared
+        return prepared
     
     def train(self, data):
         """Train the prediction model"""
@@ -210,14 +273,24 @@ class PredictionModel:
             return False
         
         try:
+            # A Booster loaded from disk is predict-only; retrain from a fresh classifier
+            if not hasattr(self.model, 'fit') and not self._native_lightgbm():
+                self.initialize_model()
+            
             prepared_data = self.prepare_features(data)
             
             if len(prepared_data) < 50:  # Need minimum data
                 log_event("insufficient_training_data", {"samples": len(prepared_data)})
                 return False
             
-            X = prepared_data[self.feature_names]
-            y = prepared_data['target']
+            X = np.ascontiguousarray(prepared_data[self.feature_names].to_numpy(np.float32))
+            y = prepared_data['target'].to_numpy()
+            
+            # Skip the refit entirely when the training set is unchanged
+            fp = hash((X.shape, X.tobytes(), y.tobytes()))
+            if fp == self._last_fp:
+                log_event("model_training_skipped", {"reason": "unchanged_data", "model_type": self.model_type})
+                return True
             
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
@@ -228,15 +301,20 @@ class PredictionModel:
             if SKLEARN_AVAILABLE and self.scaler:
                 X_train_scaled = self.scaler.fit_transform(X_train)
                 X_test_scaled = self.scaler.transform(X_test)
+                self._cache_scaler()
             else:
                 X_train_scaled = X_train
                 X_test_scaled = X_test
             
             # Train model
-            self.model.fit(X_train_scaled, y_train)
+            if self._native_lightgbm():
+                self.model = self._train_booster(X_train_scaled, y_train, X_test_scaled, y_test)
+                y_pred = (self.model.predict(X_test_scaled) > 0.5).astype(y_test.dtype)
+            else:
+                self.model.fit(X_train_scaled, y_train)
+                y_pred = self.model.predict(X_test_scaled)
             
             # Evaluate
-            y_pred = self.model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             
             log_event("model_training_complete", {
@@ -246,6 +324,7 @@ class PredictionModel:
                 "model_type": self.model_type
             })
             
+            self._last_fp = fp
             self.save_model()
             return True
             
@@ -253,6 +332,63 @@ class PredictionModel:
             log_event("model_training_error", {"error": str(e)})
             return False
     
+    def _native_lightgbm(self):
+        """Whether this model trains through lgb.train rather than the sklearn wrapper"""
+        return self.model_type == "lightgbm" and LIGHTGBM_AVAILABLE
+    
+    def _train_booster(self, X_train, y_train, X_valid, y_valid):
+        """Fit a Booster on a native Dataset, stopping once the held-out split stops improving"""
+        params = {
+            'objective': 'binary',
+            'learning_rate': 0.1,
+            'num_leaves': 31,
+            'max_depth': 6,
+            'seed': 42,
+            'feature_pre_filter': False,
+            'verbose': -1
+        }
+        train_set = lgb.Dataset(X_train, y_train, free_raw_data=True)
+        valid_set = lgb.Dataset(X_valid, y_valid, reference=train_set)
+        return lgb.train(
+            params,
+            train_set,
+            num_boost_round=500,
+            valid_sets=[valid_set],
+            callbacks=[lgb.early_stopping(20, verbose=False)]
+        )
+    
+    def _cache_scaler(self):
+        """Copy the fitted scaler's mean and 1/scale into float32 arrays"""
+        if self.scaler is not None and hasattr(self.scaler, 'mean_'):
+            self._mean = self.scaler.mean_.astype(np.float32)
+            self._inv_scale = (1.0 / self.scaler.scale_).astype(np.float32)
+        else:
+            self._mean = self._inv_scale = None
+    
+    def latest_features(self, data):
+        """Latest feature row as a float32 vector, or None when no complete row exists"""
+        prepared_data = self.prepare_features(data)
+        if len(prepared_data) == 0:
+            return None
+        # Prepared columns are feature_names followed by target; convert only the last row
+        return prepared_data.iloc[-1, :-1].to_numpy(np.float32)
+    
+    def predict_batch(self, X):
+        """Probability of an up move for each row of a float32 feature matrix"""
+        # Scale if needed
+        if self._mean is not None:
+            X = (X - self._mean) * self._inv_scale
+        elif SKLEARN_AVAILABLE and self.scaler:
+            X = self.scaler.transform(X)
+        
+        if hasattr(self.model, 'predict_proba'):
+            return self.model.predict_proba(X)[:, 1]  # Probability of class 1 (up)
+        return np.asarray(self.model.predict(X), dtype=np.float64)
+    
+    def predict_row(self, x):
+        """Probability of an up move for one unscaled feature row"""
+        return self.predict_batch(x.reshape(1, -1))[0]
+    
     def predict(self, data):
         """Make prediction on new data"""
         if self.model is None:
@@ -260,26 +396,12 @@ class PredictionModel:
             return self._rule_based_prediction(data)
         
         try:
-            prepared_data = self.prepare_features(data)
+            x = self.latest_features(data)  # Latest data point
             
-            if len(prepared_data) == 0:
+            if x is None:
                 return 0.5  # Neutral prediction
             
-            X = prepared_data[self.feature_names].iloc[-1:] # Latest data point
-            
-            # Scale if needed
-            if SKLEARN_AVAILABLE and self.scaler:
-                X_scaled = self.scaler.transform(X)
-            else:
-                X_scaled = X
-            
-            # Get prediction probability
-            if hasattr(self.model, 'predict_proba'):
-                prob = self.model.predict_proba(X_scaled)[0][1]  # Probability of class 1 (up)
-            else:
-                prob = self.model.predict(X_scaled)[0]
-            
-            return prob
+            return self.predict_row(x)
             
         except Exception as e:
             log_event("prediction_error", {"error": str(e)})
@@ -331,15 +453,35 @@ class PredictionModel:
             return
         
         try:
-            model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
+            meta = {
                 'feature_names': self.feature_names,
-                'model_type': self.model_type
+                'model_type': self.model_type,
+                'booster_file': None,
+                'estimator_file': None,
+                'scaler_files': None
             }
             
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(model_data, f)
+            # LightGBM goes to its native text format; other estimators through joblib
+            if LIGHTGBM_AVAILABLE and isinstance(self.model, (lgb.LGBMClassifier, lgb.Booster)):
+                booster = self.model if isinstance(self.model, lgb.Booster) else self.model.booster_
+                booster_path = self.model_path.with_suffix('.txt')
+                booster.save_model(str(booster_path))
+                meta['booster_file'] = booster_path.name
+            else:
+                estimator_path = self.model_path.with_suffix('.joblib')
+                joblib.dump(self.model, estimator_path)
+                meta['estimator_file'] = estimator_path.name
+            
+            # Scaler parameters as plain arrays, memory-mapped back on load
+            if self._mean is not None:
+                mean_path = self.model_path.with_suffix('.mean.npy')
+                inv_scale_path = self.model_path.with_suffix('.inv_scale.npy')
+                np.save(mean_path, np.asarray(self._mean, dtype=np.float32))
+                np.save(inv_scale_path, np.asarray(self._inv_scale, dtype=np.float32))
+                meta['scaler_files'] = [mean_path.name, inv_scale_path.name]
+            
+            with open(self.model_path, 'w') as f:
+                json.dump(meta, f)
                 
             log_event("model_saved", {"path": str(self.model_path)})
             
@@ -349,17 +491,52 @@ class PredictionModel:
     def load_model(self):
         """Load model from disk"""
         if not self.model_path.exists():
+            self._load_legacy_model()
+            return
+        
+        try:
+            with open(self.model_path) as f:
+                meta = json.load(f)
+            
+            model_dir = self.model_path.parent
+            if meta.get('booster_file'):
+                if not LIGHTGBM_AVAILABLE:
+                    return
+                # Booster.predict returns P(up) directly, which predict() reads via model.predict
+                self.model = lgb.Booster(model_file=str(model_dir / meta['booster_file']))
+            elif meta.get('estimator_file'):
+                if not SKLEARN_AVAILABLE:
+                    return
+                self.model = joblib.load(model_dir / meta['estimator_file'])
+            
+            scaler_files = meta.get('scaler_files')
+            if scaler_files:
+                self._mean = np.load(model_dir / scaler_files[0], mmap_mode='r')
+                self._inv_scale = np.load(model_dir / scaler_files[1], mmap_mode='r')
+            self.feature_names = meta.get('feature_names', [])
+            
+            log_event("model_loaded", {"path": str(self.model_path)})
+            
+        except Exception as e:
+            log_event("model_load_error", {"error": str(e)})
+    
+    def _load_legacy_model(self):
+        """Read the old shared pickle once, if it was written for this model type"""
+        if not self.legacy_model_path.exists():
             return
         
         try:
-            with open(self.model_path, 'rb') as f:
+            with open(self.legacy_model_path, 'rb') as f:
                 model_data = pickle.load(f)
             
+            if model_data.get('model_type') != self.model_type or model_data.get('model') is None:
+                return
             self.model = model_data['model']
             self.scaler = model_data.get('scaler')
+            self._cache_scaler()
             self.feature_names = model_data.get('feature_names', [])
             
-            log_event("model_loaded", {"path": str(self.model_path)})
+            log_event("model_loaded", {"path": str(self.legacy_model_path)})
             
         except Exception as e:
             log_event("model_load_error", {"error": str(e)})
@@ -380,9 +557,13 @@ class Predictor:
         for model_type in self.models:
             self.prediction_models[model_type] = PredictionModel(model_type)
         
-        # Prediction cache
+        # Prediction cache, backed by SQLite so restarts and sibling processes start warm
         self.prediction_cache = {}
         self.cache_duration = 300  # 5 minutes
+        self.cache_db_path = Path("data/prediction_cache.db")
+        self._cache_lock = threading.Lock()
+        self._cache_db = self._open_cache_db()
+        self._stop = threading.Event()  # Set by stop() to end run() without waiting out a sleep
         
         log_event("predictor_initialized", {
             "vix_source": vix_source,
@@ -390,6 +571,55 @@ class Predictor:
             "models": self.models
         })
     
+    def _open_cache_db(self):
+        """Open the on-disk prediction cache; None disables it"""
+        try:
+            self.cache_db_path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.cache_db_path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, ts REAL, blob BLOB)")
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            log_event("prediction_cache_error", {"error": str(e)})
+            return None
+    
+    def _cached_forecast(self, key, now):
+        """Fresh forecast from memory, then from disk, or None"""
+        cached = self.prediction_cache.get(key)
+        if cached is not None and now - cached[1] < self.cache_duration:
+            return cached[0]
+        
+        if self._cache_db is None:
+            return None
+        try:
+            with self._cache_lock:
+                row = self._cache_db.execute("SELECT ts, blob FROM predictions WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            log_event("prediction_cache_error", {"error": str(e)})
+            return None
+        if row is None or now - row[0] >= self.cache_duration:
+            return None
+        
+        result = json.loads(row[1])
+        self.prediction_cache[key] = (result, row[0])
+        return result
+    
+    def _store_forecast(self, key, result, ts):
+        """Keep a forecast in memory and write it through to disk"""
+        self.prediction_cache[key] = (result, ts)
+        if self._cache_db is None:
+            return
+        try:
+            blob = json.dumps(result, default=float).encode()  # NumPy scalars become plain floats
+            with self._cache_lock:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, ts, blob) VALUES (?, ?, ?)", (key, ts, blob)
+                )
+                self._cache_db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            log_event("prediction_cache_error", {"error": str(e)})
+    
     def get_market_sentiment(self):
         """Get overall market sentiment indicators"""
         vix = self.data_provider.get_vix_data()
@@ -416,75 +646,134 @@ class Predictor:
             "economic_data": economic_data
         }
     
+    def _build_forecast(self, pair, timeframe, predictions, sentiment):
+        """Turn per-model probabilities into the cached forecast dict"""
+        # Ensemble prediction (average of all models)
+        if predictions:
+            ensemble_pred = np.fromiter(predictions.values(), dtype=np.float64, count=len(predictions)).mean()
+        else:
+            ensemble_pred = 0.5  # Neutral
+        
+        # Adjust for market sentiment, clamped to [0, 1]
+        final_pred = float(np.clip(ensemble_pred + sentiment["sentiment_score"] * 0.1, 0.0, 1.0))
+        
+        # Convert to binary bias
+        bias = 1 if final_pred > 0.5 else 0
+        confidence = abs(final_pred - 0.5) * 2  # Convert to 0-1 confidence
+        
+        result = {
+            "pair": pair,
+            "bias": bias,
+            "confidence": confidence,
+            "probability": final_pred,
+            "predictions": predictions,
+            "sentiment": sentiment,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        # Cache result
+        self._store_forecast(f"{pair}_{timeframe}", result, time.time())
+        
+        log_event("prediction_generated", {
+            "pair": pair,
+            "bias": "bullish" if bias else "bearish",
+            "confidence": confidence,
+            "probability": final_pred
+        })
+        
+        return result
+    
+    def _forecast_error(self, pair, e):
+        """Neutral forecast returned when a forecast fails"""
+        log_event("forecast_error", {"pair": pair, "error": str(e)})
+        return {
+            "pair": pair,
+            "bias": 0,
+            "confidence": 0.0,
+            "probability": 0.5,
+            "error": str(e)
+        }
+    
     def forecast_direction(self, pair="EUR/USD", timeframe="1H"):
         """Forecast price direction for a currency pair"""
-        cache_key = f"{pair}_{timeframe}"
+        # Same path as a batch of one: features are built once and shared by every model
+        return self.forecast_batch([pair], timeframe)[pair]
+    
+    @staticmethod
+    def _feature_count(rows):
+        """Width of the first complete feature row, 0 if there is none"""
+        return next((len(row) for row in rows if row is not None), 0)
+    
+    def _indicator_frame(self, pair, timeframe):
+        """Demo data for one pair with indicators attached"""
+        data = self.data_provider.get_forex_data(pair, timeframe, periods=200)
+        return self.data_provider.calculate_technical_indicators(data)
+    
+    def forecast_batch(self, pairs, timeframe="1H", sentiment=None):
+        """Forecast several pairs with a single predict call per model"""
+        results = {}
+        todo = []
+        now = time.time()
+        for pair in pairs:
+            cached = self._cached_forecast(f"{pair}_{timeframe}", now)
+            if cached is not None:
+                results[pair] = cached
+            else:
+                todo.append(pair)
         
-        # Check cache
-        if cache_key in self.prediction_cache:
-            cached_prediction, timestamp = self.prediction_cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_prediction
+        if not todo:
+            return results
         
         try:
-            # Get market data
-            data = self.data_provider.get_forex_data(pair, timeframe, periods=200)
-            data_with_indicators = self.data_provider.calculate_technical_indicators(data)
-            
-            # Get market sentiment
-            sentiment = self.get_market_sentiment()
-            
-            # Get predictions from all models
-            predictions = {}
-            for model_name, model in self.prediction_models.items():
-                pred = model.predict(data_with_indicators)
-                predictions[model_name] = pred
-            
-            # Ensemble prediction (average of all models)
-            if predictions:
-                ensemble_pred = np.mean(list(predictions.values()))
+            # Pair frames are independent and mostly NumPy work, so build them side by side
+            if len(todo) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(todo), 4)) as pool:
+                    frames = list(pool.map(lambda pair: self._indicator_frame(pair, timeframe), todo))
             else:
-                ensemble_pred = 0.5  # Neutral
-            
-            # Adjust for market sentiment
-            final_pred = ensemble_pred + (sentiment["sentiment_score"] * 0.1)
-            final_pred = max(0, min(1, final_pred))  # Clamp to [0, 1]
-            
-            # Convert to binary bias
-            bias = 1 if final_pred > 0.5 else 0
-            confidence = abs(final_pred - 0.5) * 2  # Convert to 0-1 confidence
-            
-            result = {
-                "pair": pair,
-                "bias": bias,
-                "confidence": confidence,
-                "probability": final_pred,
-                "predictions": predictions,
-                "sentiment": sentiment,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            # Cache result
-            self.prediction_cache[cache_key] = (result, time.time())
-            
-            log_event("prediction_generated", {
-                "pair": pair,
-                "bias": "bullish" if bias else "bearish",
-                "confidence": confidence,
-                "probability": final_pred
-            })
-            
-            return result
-            
+                frames = [self._indicator_frame(todo[0], timeframe)]
+            
+            # VIX and macro data are market-wide, so one sentiment reading serves every pair
+            if sentiment is None:
+                sentiment = self.get_market_sentiment()
+            
+            # Features are the same for every model, so build the latest rows once
+            rows = []
+            if self.prediction_models:
+                builder = next(iter(self.prediction_models.values()))
+                rows = [builder.latest_features(frame) for frame in frames]
+            slot = {i: j for j, i in enumerate(i for i, row in enumerate(rows) if row is not None)}
+            X = np.empty((len(slot), self._feature_count(rows)), dtype=np.float32)
+            for i, j in slot.items():
+                X[j] = rows[i]
+            
+            per_pair = [{} for _ in todo]
+            for model_name, model in self.prediction_models.items():
+                probs = None
+                failed = model.model is None
+                if not failed and slot:
+                    try:
+                        probs = model.predict_batch(X)
+                    except Exception as e:
+                        log_event("prediction_error", {"error": str(e)})
+                        failed = True
+                
+                for i, frame in enumerate(frames):
+                    if failed:
+                        # Same fallback predict() uses when there is no usable model
+                        per_pair[i][model_name] = model._rule_based_prediction(frame)
+                    elif rows[i] is None:
+                        per_pair[i][model_name] = 0.5  # Neutral prediction
+                    else:
+                        per_pair[i][model_name] = probs[slot[i]]
+            
+            for pair, predictions in zip(todo, per_pair):
+                results[pair] = self._build_forecast(pair, timeframe, predictions, sentiment)
+                
         except Exception as e:
-            log_event("forecast_error", {"pair": pair, "error": str(e)})
-            return {
-                "pair": pair,
-                "bias": 0,
-                "confidence": 0.0,
-                "probability": 0.5,
-                "error": str(e)
-            }
+            for pair in todo:
+                results[pair] = self._forecast_error(pair, e)
+        
+        return {pair: results[pair] for pair in pairs}
     
     def retrain_models(self, pair="EUR/USD"):
         """Retrain prediction models with latest data"""
@@ -518,7 +807,11 @@ class Predictor:
             send_system_alert(f"Model retraining failed: {str(e)}")
             return False
     
-    def run(self):
+    def stop(self):
+        """Ask the run loop to exit at its next wait"""
+        self._stop.set()
+    
+    def run(self, interval=900, retry_delay=300):
         """Main run loop for the predictor agent"""
         log_event("predictor_started", {})
         send_system_alert("Predictor Agent started")
@@ -526,14 +819,15 @@ class Predictor:
         last_retrain = datetime.utcnow()
         retrain_interval = timedelta(days=7)  # Retrain weekly
         
-        while True:
+        # Generate predictions for main pairs
+        pairs = ["EUR/USD", "GBP/USD", "USD/JPY"]
+        
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
             try:
-                # Generate predictions for main pairs
-                pairs = ["EUR/USD", "GBP/USD", "USD/JPY"]
+                sentiment = self.get_market_sentiment()
                 
-                for pair in pairs:
-                    prediction = self.forecast_direction(pair)
-                    
+                for pair, prediction in self.forecast_batch(pairs, sentiment=sentiment).items():
                     if prediction.get("confidence", 0) > 0.7:  # High confidence prediction
                         bias_text = "Bullish" if prediction["bias"] else "Bearish"
                         send_system_alert(
@@ -546,13 +840,17 @@ class Predictor:
                     self.retrain_models()
                     last_retrain = datetime.utcnow()
                 
-                # Sleep for 15 minutes
-                time.sleep(900)
+                # Next cycle 15 minutes after this one started; missed ticks are skipped
+                next_tick = max(next_tick + interval, time.monotonic())
                 
             except Exception as e:
                 log_event("predictor_error", {"error": str(e)})
                 send_system_alert(f"Predictor error: {str(e)}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+                next_tick = time.monotonic() + retry_delay  # Wait 5 minutes before retrying
+            
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+        
+        log_event("predictor_stopped", {})
 
 if __name__ == "__main__":
     predictor = Predictor(
@@ -1,23 +1,32 @@
 # agents/risk_kernel.py
 
+import asyncio
 import numpy as np
 import time
 import os
 import sys
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.utils.logger import log_event
 from agents.utils.portfolio import get_portfolio_metrics
+from agents.utils.risk_math import REGIME_CODES, _size_kernel, _size_kernel_batch
 from utils.alerts import send_critical_alert, send_system_alert
 
 class RiskKernel:
     """Advanced risk management system for position sizing and risk control"""
     
+    # Built once; frozensets make the per-position membership test a hash lookup
+    _CORRELATION_MAP = {
+        "EUR/USD": frozenset(("GBP/USD", "AUD/USD")),
+        "GBP/USD": frozenset(("EUR/USD", "AUD/USD")),
+        "USD/JPY": frozenset(("USD/CHF",)),
+        "AUD/USD": frozenset(("EUR/USD", "GBP/USD", "NZD/USD")),
+        "NZD/USD": frozenset(("AUD/USD",))
+    }
+    
     def __init__(self, base_risk=0.02, vix_penalty_curve=None, max_drawdown=0.15):
         self.base_risk = base_risk  # Base risk per trade (2% of account)
         self.max_drawdown = max_drawdown  # Maximum allowed drawdown (15%)
@@ -28,6 +37,11 @@ class RiskKernel:
             {"threshold": 40, "multiplier": 0.3},   # Extreme volatility
             {"threshold": 50, "multiplier": 0.1}    # Crisis mode
         ]
+        # Ascending threshold/multiplier arrays for a binary-search lookup; on equal
+        # thresholds the earlier rule sits last, so it is the one searchsorted lands on
+        rules = sorted(reversed(self.vix_penalty_curve), key=lambda x: x["threshold"])
+        self._vix_thresh = np.array([rule["threshold"] for rule in rules], dtype=np.float64)
+        self._vix_mult = np.array([rule["multiplier"] for rule in rules], dtype=np.float64)
         
         # Risk limits
         self.max_positions = 5
@@ -43,6 +57,14 @@ class RiskKernel:
         self.risk_state = "normal"  # normal, cautious, defensive, emergency
         self.last_risk_update = datetime.utcnow()
         
+        # Portfolio metrics are reused for a short window so one risk evaluation reads them once
+        self.metrics_ttl = 2.0  # Seconds
+        self._metrics_cache = None  # (monotonic time, metrics)
+        
+        # A VIX reading is reused for a minute
+        self.vix_ttl = 60.0  # Seconds
+        self._vix_cache = None  # (monotonic time, vix)
+        
         # Data storage
         self.risk_data_file = Path("data/risk_metrics.json")
         self.risk_data_file.parent.mkdir(exist_ok=True)
@@ -53,13 +75,28 @@ class RiskKernel:
             "max_positions": self.max_positions
         })
     
+    def _metrics(self):
+        """Portfolio metrics, fetched at most once per metrics_ttl"""
+        now = time.monotonic()
+        if self._metrics_cache is not None and now - self._metrics_cache[0] < self.metrics_ttl:
+            return self._metrics_cache[1]
+        
+        metrics = get_portfolio_metrics()
+        self._metrics_cache = (now, metrics)
+        return metrics
+    
     def fetch_vix(self):
         """Fetch current VIX value"""
+        now = time.monotonic()
+        if self._vix_cache is not None and now - self._vix_cache[0] < self.vix_ttl:
+            return self._vix_cache[1]
+        
         try:
             # Try to fetch real VIX data (would need API key)
             # For demo, we'll simulate VIX data
             vix_value = np.random.uniform(15, 35)  # Typical VIX range
             
+            self._vix_cache = (now, vix_value)
             log_event("vix_fetched", {"vix": vix_value})
             return vix_value
             
@@ -70,7 +107,7 @@ class RiskKernel:
     def get_market_volatility(self):
         """Calculate current market volatility metrics"""
         try:
-            portfolio_metrics = get_portfolio_metrics()
+            portfolio_metrics = self._metrics()
             
             # Get recent volatility
             current_volatility = portfolio_metrics.get("volatility", 0.02)
@@ -97,12 +134,9 @@ class RiskKernel:
     
     def apply_vix_penalty(self, base_risk, vix):
         """Apply VIX-based risk reduction"""
-        multiplier = 1.0
-        
-        for rule in sorted(self.vix_penalty_curve, key=lambda x: x["threshold"], reverse=True):
-            if vix >= rule["threshold"]:
-                multiplier = rule["multiplier"]
-                break
+        # Highest threshold at or below the VIX; below every threshold means no penalty
+        idx = int(np.searchsorted(self._vix_thresh, vix, side="right")) - 1
+        multiplier = float(self._vix_mult[idx]) if idx >= 0 else 1.0
         
         adjusted_risk = base_risk * multiplier
         
@@ -115,10 +149,17 @@ class RiskKernel:
         
         return adjusted_risk
     
+    def apply_vix_penalty_batch(self, base_risk, vix):
+        """apply_vix_penalty over arrays of scenarios (stress tests, VIX sweeps); not logged per scenario"""
+        vix = np.asarray(vix, dtype=np.float64)
+        idx = np.searchsorted(self._vix_thresh, vix, side="right") - 1
+        multiplier = np.where(idx >= 0, self._vix_mult[np.maximum(idx, 0)], 1.0)
+        return np.asarray(base_risk, dtype=np.float64) * multiplier
+    
     def apply_performance_penalty(self, base_risk):
         """Apply performance-based risk adjustments"""
         try:
-            portfolio_metrics = get_portfolio_metrics()
+            portfolio_metrics = self._metrics()
             
             multiplier = 1.0
             
@@ -161,49 +202,20 @@ class RiskKernel:
         try:
             # Get current account balance
             if account_balance is None:
-                portfolio_metrics = get_portfolio_metrics()
+                portfolio_metrics = self._metrics()
                 account_balance = portfolio_metrics.get("equity_curve", [1000])[-1]
             
             # Get market conditions
             vix = self.fetch_vix()
             volatility_data = self.get_market_volatility()
+            portfolio_metrics = self._metrics()
             
-            # Start with base risk
-            risk_amount = account_balance * self.base_risk
-            
-            # Apply VIX penalty
-            risk_amount = self.apply_vix_penalty(risk_amount, vix)
-            
-            # Apply performance penalty
-            risk_amount = self.apply_performance_penalty(risk_amount)
-            
-            # Apply volatility adjustment
-            vol_multiplier = 1.0
-            if volatility_data["regime"] == "high":
-                vol_multiplier = 0.7
-            elif volatility_data["regime"] == "extreme":
-                vol_multiplier = 0.4
-            
-            risk_amount *= vol_multiplier
-            
-            # Calculate position size based on stop loss
-            if stop_loss_pips and stop_loss_pips > 0:
-                # Assume $10 per pip for major pairs (simplified)
-                pip_value = 10
-                position_size = risk_amount / (stop_loss_pips * pip_value)
-                
-                # Round to reasonable size
-                position_size = max(1000, round(position_size, -3))  # Minimum 1000 units
-            else:
-                # Default position size based on volatility
-                position_size = risk_amount / (volatility_data["volatility"] * account_balance)
-                position_size = max(1000, round(position_size, -3))
-            
-            # Apply maximum position limits
-            max_position_value = account_balance * self.max_risk_per_pair
-            max_position_size = max_position_value / 1.1  # Assume EUR/USD around 1.1
-            
-            final_position_size = min(position_size, max_position_size)
+            # VIX, performance and volatility penalties, sizing and capping in one kernel call
+            args = self._kernel_args(account_balance, vix, volatility_data, portfolio_metrics)
+            risk_amount, position_size, final_position_size, vix_multiplier, performance_multiplier = _size_kernel(
+                *args[:-1], float(stop_loss_pips or 0.0), args[-1]
+            )
+            self._log_penalties(account_balance, vix, vix_multiplier, performance_multiplier, portfolio_metrics)
             
             # Update risk state
             self._update_risk_state(vix, volatility_data, account_balance)
@@ -228,9 +240,80 @@ class RiskKernel:
             # Return conservative default
             return 1000
     
+    def _kernel_args(self, account_balance, vix, volatility_data, portfolio_metrics):
+        """Sizing kernel arguments, without the stop, with the per-pair cap last"""
+        return (
+            float(account_balance), float(self.base_risk), float(vix),
+            self._vix_thresh, self._vix_mult,
+            float(portfolio_metrics.get("win_rate", 0.5)),
+            float(portfolio_metrics.get("sharpe", 0.0)),
+            float(portfolio_metrics.get("drawdown", 0.0)) / 100,
+            float(self.win_rate_threshold), float(self.sharpe_threshold), float(self.max_drawdown),
+            float(volatility_data["volatility"]),
+            REGIME_CODES.get(volatility_data["regime"], 1),
+            float(account_balance * self.max_risk_per_pair)
+        )
+    
+    def _log_penalties(self, account_balance, vix, vix_multiplier, performance_multiplier, portfolio_metrics):
+        """Audit events for the penalties applied inside the sizing kernel"""
+        base_risk = account_balance * self.base_risk
+        vix_adjusted = base_risk * vix_multiplier
+        log_event("vix_penalty_applied", {
+            "vix": vix,
+            "multiplier": vix_multiplier,
+            "base_risk": base_risk,
+            "adjusted_risk": vix_adjusted
+        })
+        log_event("performance_penalty_applied", {
+            "win_rate": portfolio_metrics.get("win_rate", 0.5),
+            "sharpe": portfolio_metrics.get("sharpe", 0.0),
+            "drawdown": portfolio_metrics.get("drawdown", 0.0) / 100,
+            "multiplier": performance_multiplier,
+            "adjusted_risk": vix_adjusted * performance_multiplier
+        })
+    
+    def calculate_position_sizes(self, pairs, stop_loss_pips, account_balance=None):
+        """Position sizes for several candidate pairs with one set of market inputs"""
+        stops = np.asarray(stop_loss_pips, dtype=np.float64)
+        try:
+            if account_balance is None:
+                account_balance = self._metrics().get("equity_curve", [1000])[-1]
+            
+            # VIX, volatility and performance are shared by every pair, so gather them once
+            vix = self.fetch_vix()
+            volatility_data = self.get_market_volatility()
+            portfolio_metrics = self._metrics()
+            
+            # The same kernel as calculate_position_size, run over every pair's stop
+            args = self._kernel_args(account_balance, vix, volatility_data, portfolio_metrics)
+            risk_amount, vix_multiplier, performance_multiplier, sizes = _size_kernel_batch(
+                *args[:-1], np.ascontiguousarray(stops.reshape(-1)), args[-1]
+            )
+            sizes = sizes.reshape(stops.shape)
+            self._log_penalties(account_balance, vix, vix_multiplier, performance_multiplier, portfolio_metrics)
+            
+            self._update_risk_state(vix, volatility_data, account_balance)
+            
+            log_event("position_sizes_calculated", {
+                "pairs": list(pairs),
+                "account_balance": account_balance,
+                "vix": vix,
+                "volatility_regime": volatility_data["regime"],
+                "risk_amount": risk_amount,
+                "final_sizes": sizes.astype(np.int64).tolist(),
+                "risk_state": self.risk_state
+            })
+            
+            return sizes.astype(np.int64)
+            
+        except Exception as e:
+            log_event("position_size_error", {"error": str(e)})
+            # Conservative default for every pair
+            return np.full(stops.shape, 1000, dtype=np.int64)
+    
     def _update_risk_state(self, vix, volatility_data, account_balance):
         """Update overall risk state based on market conditions"""
-        portfolio_metrics = get_portfolio_metrics()
+        portfolio_metrics = self._metrics()
         current_drawdown = portfolio_metrics.get("drawdown", 0.0) / 100
         
         # Determine risk state
@@ -277,35 +360,39 @@ class RiskKernel:
                 })
                 return False, "Maximum number of positions reached"
             
-            # Check pair-specific risk
+            # Pair and correlated exposure accumulated in one pass over the positions
             pair = new_position_data.get("pair", "EUR/USD")
-            pair_exposure = sum(pos["risk_amount"] for pos in current_positions if pos["pair"] == pair)
+            new_risk = new_position_data.get("risk_amount", 0)
+            correlated_pairs = self._get_correlated_pairs(pair)
+            pair_exposure = 0
+            correlated_exposure = 0
+            for pos in current_positions:
+                position_pair = pos["pair"]
+                if position_pair == pair:
+                    pair_exposure += pos["risk_amount"]
+                if position_pair in correlated_pairs:
+                    correlated_exposure += pos["risk_amount"]
             
-            portfolio_metrics = get_portfolio_metrics()
+            # Check pair-specific risk
+            portfolio_metrics = self._metrics()
             account_balance = portfolio_metrics.get("equity_curve", [1000])[-1]
             max_pair_risk = account_balance * self.max_risk_per_pair
             
-            if pair_exposure + new_position_data.get("risk_amount", 0) > max_pair_risk:
+            if pair_exposure + new_risk > max_pair_risk:
                 log_event("pair_risk_limit_exceeded", {
                     "pair": pair,
                     "current_exposure": pair_exposure,
-                    "new_risk": new_position_data.get("risk_amount", 0),
+                    "new_risk": new_risk,
                     "max_pair_risk": max_pair_risk
                 })
                 return False, f"Pair risk limit exceeded for {pair}"
             
             # Check correlation limits (simplified)
-            correlated_pairs = self._get_correlated_pairs(pair)
-            correlated_exposure = sum(
-                pos["risk_amount"] for pos in current_positions 
-                if pos["pair"] in correlated_pairs
-            )
-            
             max_correlation_risk = account_balance * self.max_correlation_exposure
-            if correlated_exposure + new_position_data.get("risk_amount", 0) > max_correlation_risk:
+            if correlated_exposure + new_risk > max_correlation_risk:
                 log_event("correlation_limit_exceeded", {
                     "pair": pair,
-                    "correlated_pairs": correlated_pairs,
+                    "correlated_pairs": sorted(correlated_pairs),
                     "correlated_exposure": correlated_exposure,
                     "max_correlation_risk": max_correlation_risk
                 })
@@ -325,20 +412,13 @@ class RiskKernel:
     
     def _get_correlated_pairs(self, pair):
         """Get pairs that are correlated with the given pair"""
-        correlation_map = {
-            "EUR/USD": ["GBP/USD", "AUD/USD"],
-            "GBP/USD": ["EUR/USD", "AUD/USD"],
-            "USD/JPY": ["USD/CHF"],
-            "AUD/USD": ["EUR/USD", "GBP/USD", "NZD/USD"],
-            "NZD/USD": ["AUD/USD"]
-        }
-        
-        return correlation_map.get(pair, [])
+        return self._CORRELATION_MAP.get(pair, frozenset())
     
-    def get_risk_metrics(self):
+    def get_risk_metrics(self, vix=None):
         """Get current risk metrics and state"""
-        portfolio_metrics = get_portfolio_metrics()
-        vix = self.fetch_vix()
+        portfolio_metrics = self._metrics()
+        if vix is None:
+            vix = self.fetch_vix()
         volatility_data = self.get_market_volatility()
         
         return {
@@ -367,30 +447,44 @@ class RiskKernel:
         self.risk_state = "emergency"
         return True
     
-    def run(self):
+    def run(self, interval=300, retry_delay=60):
         """Main run loop for the risk kernel"""
+        # Synchronous entry point, so the launcher's agent.run() call drives the async loop
+        asyncio.run(self._run_async(interval, retry_delay))
+    
+    async def _run_async(self, interval, retry_delay):
+        """Risk checks every `interval` seconds, with blocking work in worker threads"""
         log_event("risk_kernel_started", {})
         send_system_alert("Risk Kernel started")
         
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while True:
             try:
+                # VIX and portfolio metrics load concurrently in worker threads
+                vix_task = asyncio.create_task(asyncio.to_thread(self.fetch_vix))
+                await asyncio.to_thread(self._metrics)
+                vix = await vix_task
+                
                 # Update risk metrics
-                risk_metrics = self.get_risk_metrics()
+                risk_metrics = await asyncio.to_thread(self.get_risk_metrics, vix)
                 
                 # Check for emergency conditions
                 if risk_metrics["current_drawdown"] > self.max_drawdown * 100:
-                    self.emergency_stop()
+                    await asyncio.to_thread(self.emergency_stop)
                 
                 # Log current risk state
                 log_event("risk_metrics_update", risk_metrics)
                 
-                # Sleep for 5 minutes
-                time.sleep(300)
+                # Every 5 minutes from the first tick; ticks missed during a stall are skipped
+                next_tick = max(next_tick + interval, loop.time())
                 
             except Exception as e:
                 log_event("risk_kernel_error", {"error": str(e)})
-                send_system_alert(f"Risk Kernel error: {str(e)}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                await asyncio.to_thread(send_system_alert, f"Risk Kernel error: {str(e)}")
+                next_tick = loop.time() + retry_delay  # Wait 1 minute before retrying
+            
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
 
 if __name__ == "__main__":
     risk_kernel = RiskKernel()
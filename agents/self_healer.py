@@ -3,15 +3,23 @@
 import time
 import random
 import subprocess
-import smtplib
+from pathlib import Path
 from core.utils.health import is_overloaded, get_system_health, print_health
 from core.utils.alerts import notify_telegram, notify_sms
 from core.utils.crypto import rotate_keys_kyber
 
+try:
+    import docker
+    DOCKER_AVAILABLE = True
+except ImportError:
+    DOCKER_AVAILABLE = False
+
 drawdown_threshold = 0.15  # 15%
 max_latency_ms = 250
 resource_thresholds = {"cpu": 85, "memory": 85, "disk": 90}
-last_key_rotation = time.time()
+last_key_rotation = None  # Read from key_rotation_file on the first check, then kept in memory
+key_rotation_file = Path("data/last_key_rotation.txt")
+_docker_client = None
 
 def get_drawdown():
     # Placeholder - connect to actual portfolio PnL tracking
@@ -21,9 +29,32 @@ def get_latency():
     # Simulate latency test (replace with ZeroMQ ping test)
     return random.randint(100, 400)
 
+def _docker():
+    """Shared Docker API client, or None when only the CLI is available"""
+    global _docker_client
+    if _docker_client is None and DOCKER_AVAILABLE:
+        try:
+            _docker_client = docker.from_env()
+        except docker.errors.DockerException as e:
+            print(f"[WARNING] Docker API unavailable, using the CLI: {e}")
+    return _docker_client
+
+def container_action(agent_name, action):
+    """Restart or stop a container through the Docker API, falling back to the CLI"""
+    client = _docker()
+    if client is None:
+        return subprocess.run(["docker", action, agent_name]).returncode == 0
+
+    try:
+        getattr(client.containers.get(agent_name), action)()
+        return True
+    except docker.errors.DockerException as e:
+        notify_telegram(f"❌ Docker {action} of {agent_name} failed: {e}")
+        return False
+
 def restart_agent(agent_name):
-    subprocess.run(["docker", "restart", agent_name])
-    notify_telegram(f"🔁 Restarted {agent_name} due to overload or failure.")
+    if container_action(agent_name, "restart"):
+        notify_telegram(f"🔁 Restarted {agent_name} due to overload or failure.")
 
 def handle_failures():
     overloaded = is_overloaded(resource_thresholds)
@@ -43,23 +74,40 @@ def handle_failures():
     if drawdown > drawdown_threshold:
         notify_telegram(f"🚨 Max drawdown breached: {drawdown:.2%}")
         notify_sms("🚨 Drawdown triggered. Manual review recommended.")
-        subprocess.run(["docker", "stop", "fusion_agent"])
+        container_action("fusion_agent", "stop")
+
+def _save_key_rotation():
+    key_rotation_file.parent.mkdir(exist_ok=True)
+    key_rotation_file.write_text(str(last_key_rotation))
 
 def maybe_rotate_keys():
     global last_key_rotation
+    if last_key_rotation is None:
+        try:
+            last_key_rotation = float(key_rotation_file.read_text().strip())
+        except (OSError, ValueError):
+            # No record yet: the 90-day window starts now and survives restarts
+            last_key_rotation = time.time()
+            _save_key_rotation()
+    
     days_since_rotation = (time.time() - last_key_rotation) / 86400
 
     if days_since_rotation > 90:
         rotate_keys_kyber(["Frankfurt", "Singapore", "Virginia"])
         notify_telegram("🔐 Kyber1024 keys rotated.")
         last_key_rotation = time.time()
+        _save_key_rotation()
 
 if __name__ == "__main__":
     print("[👨‍⚕️] Self-Healer started")
+    next_tick = time.monotonic()
     while True:
         try:
             handle_failures()
             maybe_rotate_keys()
         except Exception as e:
             notify_telegram(f"❌ Self-healer exception: {str(e)}")
-        time.sleep(1800)  # Run every 30 minutes
\ No newline at end of file
+        # Run every 30 minutes from the first check, however long each check took;
+        # after a stall, resume from now instead of firing the missed checks back to back
+        next_tick = max(next_tick + 1800, time.monotonic())
+        time.sleep(max(0.0, next_tick - time.monotonic()))
\ No newline at end of file
@@ -0,0 +1,171 @@
+# agents/utils/_indicators.py
+
+import os
+
+import numpy as np
+
+# Persist compiled kernels next to the other model artifacts so restarts skip compilation.
+# numba reads this once on first import, so every module imports njit from here, never numba
+os.environ.setdefault(
+    "NUMBA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models", "numba_cache")
+)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit("float64[:](float64[:], int64)", cache=True)
+def _wilder_rsi(close, period):
+    """RSI with Wilder smoothing, seeded by the simple mean of the first `period` changes"""
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    if n <= period:
+        return rsi
+
+    # Branchless split of each bar's change into its up and down parts
+    delta = close[1:] - close[:-1]
+    up = np.maximum(delta, 0.0)
+    down = np.maximum(-delta, 0.0)
+
+    avg_up = up[:period].mean()
+    avg_down = down[:period].mean()
+    for i in range(period, n):
+        if i > period:
+            avg_up = (avg_up * (period - 1) + up[i - 1]) / period
+            avg_down = (avg_down * (period - 1) + down[i - 1]) / period
+        if avg_down > 0:
+            rsi[i] = 100 - 100 / (1 + avg_up / avg_down)
+        elif avg_up > 0:
+            rsi[i] = 100.0  # Only gains in the window; both zero stays NaN
+    return rsi
+
+# Explicit signatures compile eagerly at import (or load from the cache) instead of on the first forecast
+@njit("UniTuple(float64[:], 6)(float64[:], float64[:])", cache=True)
+def _indicator_kernel(close, volume):
+    """Single pass over close/volume keeping running window sums"""
+    n = close.shape[0]
+    sma_20 = np.full(n, np.nan)
+    sma_50 = np.full(n, np.nan)
+    bb_upper = np.full(n, np.nan)
+    bb_lower = np.full(n, np.nan)
+    rsi = _wilder_rsi(close, 14)
+    volume_sma = np.full(n, np.nan)
+    if n == 0:
+        return sma_20, sma_50, bb_upper, bb_lower, rsi, volume_sma
+
+    # Sums are taken relative to the first close so the variance stays well conditioned
+    ref = close[0]
+    sum20 = 0.0
+    sumsq20 = 0.0
+    sum50 = 0.0
+    vol20 = 0.0
+
+    for i in range(n):
+        x = close[i] - ref
+        sum20 += x
+        sumsq20 += x * x
+        sum50 += x
+        vol20 += volume[i]
+
+        if i >= 20:
+            old = close[i - 20] - ref
+            sum20 -= old
+            sumsq20 -= old * old
+            vol20 -= volume[i - 20]
+        if i >= 50:
+            sum50 -= close[i - 50] - ref
+
+        if i >= 19:
+            mean = sum20 / 20
+            var = max((sumsq20 - 20 * mean * mean) / 19, 0.0)  # Sample variance, as pandas
+            std = np.sqrt(var)
+            sma_20[i] = mean + ref
+            bb_upper[i] = mean + ref + 2 * std
+            bb_lower[i] = mean + ref - 2 * std
+            volume_sma[i] = vol20 / 20
+        if i >= 49:
+            sma_50[i] = sum50 / 50 + ref
+
+    return sma_20, sma_50, bb_upper, bb_lower, rsi, volume_sma
+
+@njit("UniTuple(float64[:], 5)(float64[:], float64, float64, float64)", cache=True)
+def _ema_macd_kernel(close, a12, a26, a9):
+    """EMA(12), EMA(26), MACD, signal and histogram in one pass"""
+    n = close.shape[0]
+    ema_12 = np.empty(n)
+    ema_26 = np.empty(n)
+    macd = np.empty(n)
+    signal = np.empty(n)
+    histogram = np.empty(n)
+
+    # Numerator/denominator form of pandas' adjusted EWMA (ewm(span=...).mean())
+    num12 = den12 = num26 = den26 = num9 = den9 = 0.0
+    for i in range(n):
+        x = close[i]
+        num12 = x + (1 - a12) * num12
+        den12 = 1 + (1 - a12) * den12
+        num26 = x + (1 - a26) * num26
+        den26 = 1 + (1 - a26) * den26
+        ema_12[i] = num12 / den12
+        ema_26[i] = num26 / den26
+
+        m = ema_12[i] - ema_26[i]
+        num9 = m + (1 - a9) * num9
+        den9 = 1 + (1 - a9) * den9
+        macd[i] = m
+        signal[i] = num9 / den9
+        histogram[i] = m - signal[i]
+
+    return ema_12, ema_26, macd, signal, histogram
+
+def _rolling_mean(x, window):
+    """Trailing rolling mean via a cumulative sum; NaN until the window fills"""
+    out = np.full(x.shape[0], np.nan)
+    if x.shape[0] >= window:
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        out[window - 1:] = (c[window:] - c[:-window]) / window
+    return out
+
+def _indicator_numpy(close, volume):
+    """Vectorized equivalent of _indicator_kernel for when numba is absent"""
+    ref = close[0] if close.shape[0] else 0.0
+    x = close - ref
+
+    mean_20 = _rolling_mean(x, 20)
+    var_20 = np.maximum((_rolling_mean(x * x, 20) - mean_20 * mean_20) * (20 / 19), 0.0)
+    std_20 = np.sqrt(var_20)
+    sma_20 = mean_20 + ref
+    sma_50 = _rolling_mean(x, 50) + ref
+
+    rsi = _wilder_rsi(close, 14)
+
+    return sma_20, sma_50, sma_20 + 2 * std_20, sma_20 - 2 * std_20, rsi, _rolling_mean(volume, 20)
+
+def compute_indicators(close, volume):
+    """Return (sma_20, sma_50, bb_upper, bb_lower, rsi, volume_sma) as float64 arrays"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    volume = np.ascontiguousarray(volume, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _indicator_kernel(close, volume)
+    return _indicator_numpy(close, volume)
+
+def compute_ema_macd(close):
+    """Return (ema_12, ema_26, macd, macd_signal, macd_histogram) as float64 arrays"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    return _ema_macd_kernel(close, 2 / 13, 2 / 27, 2 / 10)
+
+def pct_change(x, periods=1):
+    """Fractional change over `periods` bars; NaN where there is no earlier bar"""
+    out = np.full(x.shape[0], np.nan)
+    if x.shape[0] > periods:
+        out[periods:] = x[periods:] / x[:-periods] - 1
+    return out
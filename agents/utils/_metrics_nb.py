@@ -0,0 +1,77 @@
+# agents/utils/_metrics_nb.py
+
+import numpy as np
+
+# Same numba shim and on-disk kernel cache as the indicator kernels
+from agents.utils._indicators import NUMBA_AVAILABLE, njit
+
+# No explicit signature: the cached equity array is read-only, which numba types separately
+@njit(cache=True)
+def _metrics_kernel(equity):
+    """Sharpe, Sortino, max drawdown (%) and volatility in one pass over the equity curve"""
+    n = equity.shape[0] - 1
+    # Welford accumulators for all returns and for the negative ones
+    mean = 0.0
+    m2 = 0.0
+    neg_n = 0
+    neg_mean = 0.0
+    neg_m2 = 0.0
+    peak = equity[0]
+    max_dd = 0.0
+
+    for i in range(1, n + 1):
+        r = (equity[i] - equity[i - 1]) / equity[i - 1]
+        delta = r - mean
+        mean += delta / i
+        m2 += delta * (r - mean)
+        if r < 0:
+            neg_n += 1
+            neg_delta = r - neg_mean
+            neg_mean += neg_delta / neg_n
+            neg_m2 += neg_delta * (r - neg_mean)
+
+        if equity[i] > peak:
+            peak = equity[i]
+        dd = (peak - equity[i]) / peak
+        if dd > max_dd:
+            max_dd = dd
+
+    # Population (ddof=0) statistics, as np.std
+    std = np.sqrt(m2 / n)
+    sharpe = mean / std * np.sqrt(252.0) if n > 1 and std > 0 else 0.0
+
+    if neg_n > 0:
+        downside_std = np.sqrt(neg_m2 / neg_n)
+        sortino = mean / downside_std * np.sqrt(252.0) if downside_std > 0 else 0.0
+    else:
+        sortino = sharpe
+
+    volatility = std if n > 1 else 0.02
+    return sharpe, sortino, max_dd * 100, volatility
+
+def _metrics_numpy(equity):
+    """Vectorized equivalent of _metrics_kernel for when numba is absent"""
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std()
+    mean = returns.mean()
+    sharpe = mean / std * np.sqrt(252) if len(returns) > 1 and std > 0 else 0.0
+
+    negative_returns = returns[returns < 0]
+    if len(negative_returns) > 0:
+        downside_std = negative_returns.std()
+        sortino = mean / downside_std * np.sqrt(252) if downside_std > 0 else 0.0
+    else:
+        sortino = sharpe
+
+    peak = np.maximum.accumulate(equity)
+    drawdown = np.max((peak - equity) / peak) * 100
+
+    volatility = std if len(returns) > 1 else 0.02
+    return float(sharpe), float(sortino), float(drawdown), float(volatility)
+
+def compute_metrics(equity):
+    """Return (sharpe, sortino, drawdown %, volatility) for an equity curve of 2+ points"""
+    equity = np.ascontiguousarray(equity, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _metrics_kernel(equity)
+    return _metrics_numpy(equity)
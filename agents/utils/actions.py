@@ -1,12 +1,11 @@
 # agents/utils/actions.py
 
 import numpy as np
-from itertools import product
 
 class ActionSpace:
     """Discrete action space for the meta controller"""
     
-    def __init__(self, action_config):
+    def __init__(self, action_config, rng=None):
         """
         action_config: dict with action names and their possible values
         Example: {
@@ -14,35 +13,87 @@ class ActionSpace:
             "pair_expansion": [0, 1, 2],
             "retrain_frequency": [7, 14, 30]
         }
+        rng: numpy Generator or int seed for sample(); by default seeded from np.random,
+        so np.random.seed() still makes sampling reproducible
         """
         self.action_config = action_config
         self.action_names = list(action_config.keys())
         self.action_values = list(action_config.values())
         
-        # Generate all possible action combinations
-        self.action_combinations = list(product(*self.action_values))
-        self.size = len(self.action_combinations)
+        # Combinations are decoded from the index on demand instead of materialized
+        self._sizes = [len(values) for values in self.action_values]
+        self.size = int(np.prod(self._sizes, dtype=np.int64))
+        
+        # Mixed-radix strides matching product() order (last dimension varies fastest)
+        self._strides = [int(np.prod(self._sizes[i + 1:], dtype=np.int64)) for i in range(len(self._sizes))]
+        self._value_index = [{} for _ in self.action_values]
+        for lookup, values in zip(self._value_index, self.action_values):
+            for j, value in enumerate(values):
+                lookup.setdefault(value, j)  # First occurrence wins, as list.index did
+        
+        # Dimensions whose values are all numbers, for the float32 table
+        self.numeric_names = [
+            name for name, values in zip(self.action_names, self.action_values)
+            if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values)
+        ]
+        self._codes = None
+        self._numeric_table = None
+        
+        self._rng = np.random.default_rng(np.random.randint(2**31) if rng is None else rng)
+        self._sample_buf = np.empty(0, dtype=np.int64)
+        self._sample_ptr = 0
     
     def decode(self, action_idx):
         """Convert action index to action dictionary"""
-        if action_idx >= self.size:
-            action_idx = action_idx % self.size
+        i = action_idx % self.size
         
-        combination = self.action_combinations[action_idx]
-        return dict(zip(self.action_names, combination))
+        positions = []
+        for n in reversed(self._sizes):
+            i, r = divmod(i, n)
+            positions.append(r)
+        return {
+            name: values[j]
+            for name, values, j in zip(self.action_names, self.action_values, reversed(positions))
+        }
     
     def encode(self, action_dict):
         """Convert action dictionary to action index"""
-        values = tuple(action_dict[name] for name in self.action_names)
         try:
-            return self.action_combinations.index(values)
-        except ValueError:
+            return sum(
+                lookup[action_dict[name]] * stride
+                for name, lookup, stride in zip(self.action_names, self._value_index, self._strides)
+            )
+        except KeyError:
             # If exact match not found, find closest
             return 0
     
+    def codes(self):
+        """Value positions of every action as a read-only (size, n_dims) array in index order, built on first use"""
+        if self._codes is None:
+            self._codes = np.stack(np.unravel_index(np.arange(self.size), self._sizes), axis=1)
+            self._codes.setflags(write=False)
+        return self._codes
+    
+    def numeric_table(self):
+        """Numeric action values as a read-only (size, len(numeric_names)) float32 array, one row per action"""
+        if self._numeric_table is None:
+            codes = self.codes()
+            columns = [
+                np.asarray(self.action_config[name], dtype=np.float32)[codes[:, self.action_names.index(name)]]
+                for name in self.numeric_names
+            ]
+            self._numeric_table = np.stack(columns, axis=1) if columns else np.empty((self.size, 0), dtype=np.float32)
+            self._numeric_table.setflags(write=False)
+        return self._numeric_table
+    
     def sample(self):
         """Sample a random action"""
-        action_idx = np.random.randint(self.size)
+        # Draws come from a pre-filled buffer, refilled 4096 at a time
+        if self._sample_ptr >= len(self._sample_buf):
+            self._sample_buf = self._rng.integers(0, self.size, size=4096)
+            self._sample_ptr = 0
+        action_idx = int(self._sample_buf[self._sample_ptr])
+        self._sample_ptr += 1
         return self.decode(action_idx)
     
     def get_action_bounds(self):
@@ -1,34 +1,139 @@
 # agents/utils/logger.py
 
+import atexit
 import json
 import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Create logs directory if it doesn't exist
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
+# Console echo of every event; set FUSIONFX_LOG_CONSOLE=0 to keep stdout quiet
+LOG_TO_CONSOLE = os.environ.get("FUSIONFX_LOG_CONSOLE", "1") != "0"
+_console_lock = threading.Lock()  # Agents log from many threads; one echo line at a time
+
+# Events ranked below FUSIONFX_LOG_LEVEL are dropped before anything is built; unknown levels rank as INFO
+_LEVEL_ORDER = {"DEBUG": 0, "INFO": 1, "TRADE": 2, "METRICS": 2, "WARNING": 2, "ERROR": 3, "CRITICAL": 4}
+LOG_LEVEL = os.environ.get("FUSIONFX_LOG_LEVEL", "INFO").upper()
+_MIN_RANK = _LEVEL_ORDER.get(LOG_LEVEL, 1)
+
+# Serialized lines are handed to a background writer that appends them in batches
+_LOG_BATCH = 64
+_LOG_BUFFER = 1 << 16
+_log_q = queue.Queue()
+_STOP = object()
+
+def _dumps(obj):
+    """Serialize to compact JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def _log_writer():
+    """Drain the queue into the day's log file, one write() per batch"""
+    log_fh = None
+    log_date = None
+    stopping = False
+    while not stopping:
+        batch = [_log_q.get()]
+        while len(batch) < _LOG_BATCH and not _log_q.empty():
+            batch.append(_log_q.get_nowait())
+        stopping = any(entry is _STOP for entry in batch)
+        
+        try:
+            # Consecutive lines for the same day go out in a single write
+            lines = [entry for entry in batch if entry is not _STOP]
+            for day, group in groupby(lines, key=itemgetter(0)):
+                if day != log_date:
+                    if log_fh is not None:
+                        log_fh.close()
+                    LOG_DIR.mkdir(exist_ok=True)
+                    log_fh = open(LOG_DIR / f"fusionfx_{day}.log", "ab", buffering=_LOG_BUFFER)
+                    log_date = day
+                log_fh.write(b"".join(line for _, line in group))
+            # During a burst lines pile up in the 64 KiB buffer; flush once the queue runs dry
+            if log_fh is not None and _log_q.empty():
+                log_fh.flush()
+        except OSError as e:
+            print(f"[WARNING] Log write failed: {e}")
+            log_fh = None
+            log_date = None
+        finally:
+            for _ in batch:
+                _log_q.task_done()
+    
+    if log_fh is not None:
+        log_fh.close()
+
+_log_thread = threading.Thread(target=_log_writer, name="log-writer", daemon=True)
+_log_thread.start()
+
+def flush_logs():
+    """Block until every queued event has been written"""
+    _log_q.join()
+
+@atexit.register
+def _close_log_writer():
+    """Write out whatever is still queued before the interpreter exits"""
+    _log_q.put(_STOP)
+    _log_thread.join(timeout=5)
+
+# Last formatted timestamp: (time.time(), isoformat, log file date)
+_ts_cache = (0.0, "", "")
+
+def _now_iso():
+    """UTC isoformat timestamp and log file date, reused for events in the same millisecond"""
+    global _ts_cache
+    t = time.time()
+    cached = _ts_cache
+    if 0.0 <= t - cached[0] < 0.001:
+        return cached[1], cached[2]
+    
+    now = datetime.utcfromtimestamp(t)
+    cached = (t, now.isoformat(), now.strftime('%Y%m%d'))
+    _ts_cache = cached
+    return cached[1], cached[2]
+
 def log_event(event_type, data, level="INFO"):
     """Log events to both file and console"""
-    timestamp = datetime.utcnow().isoformat()
-    log_entry = {
-        "timestamp": timestamp,
-        "event_type": event_type,
-        "level": level,
-        "data": data
-    }
+    if _LEVEL_ORDER.get(level, 1) < _MIN_RANK:
+        return
+    
+    timestamp, log_date = _now_iso()
+    
+    # The payload is serialized once and shared by the file line and the console echo
+    payload = _dumps(data)
+    line = b'{"timestamp":"%s","event_type":%s,"level":%s,"data":%s}\n' % (
+        timestamp.encode(), _dumps(event_type), _dumps(level), payload
+    )
     
-    # Log to file
-    log_file = LOG_DIR / f"fusionfx_{datetime.utcnow().strftime('%Y%m%d')}.log"
-    with open(log_file, "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
+    # Log to file (serialized here so later changes to data can't leak into the line)
+    _log_q.put((log_date, line))
     
     # Log to console
-    print(f"[{timestamp}] {level} - {event_type}: {json.dumps(data)}")
+    if LOG_TO_CONSOLE:
+        text = f"[{timestamp}] {level} - {event_type}: {payload.decode()}\n"
+        with _console_lock:
+            sys.stdout.write(text)
 
 def log_trade(trade_data):
     """Specialized logging for trade events"""
+    if hasattr(trade_data, "to_dict"):
+        trade_data = trade_data.to_dict()
     log_event("trade_executed", trade_data, "TRADE")
 
 def log_error(error_msg, context=None):
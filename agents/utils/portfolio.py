@@ -2,63 +2,169 @@
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import json
+import os
+import threading
+import time
+from bisect import bisect_right
 from pathlib import Path
 
+from agents.utils._metrics_nb import compute_metrics
+
 class PortfolioTracker:
     def __init__(self):
-        self.trades_file = Path("data/trades.json")
-        self.equity_file = Path("data/equity_curve.json")
+        # Append-only JSON Lines: each write adds one record instead of rewriting the history
+        self.trades_file = Path("data/trades.jsonl")
+        self.equity_file = Path("data/equity_curve.jsonl")
         self.trades_file.parent.mkdir(exist_ok=True)
         
+        self._migrate_legacy_files()
+        
         # Initialize files if they don't exist
         if not self.trades_file.exists():
-            with open(self.trades_file, "w") as f:
-                json.dump([], f)
+            self.trades_file.touch()
         
         if not self.equity_file.exists():
-            with open(self.equity_file, "w") as f:
-                json.dump({"timestamps": [], "equity": [1000.0]}, f)  # Start with $1000
+            self._append(self.equity_file, [{"t": None, "e": 1000.0}])  # Start with $1000
+        
+        # Parsed history kept in memory; only bytes appended since the last read are parsed.
+        # Agents read from worker threads, so refreshes and reads of that state hold the lock
+        self._lock = threading.Lock()
+        self._trades_read = {"key": None, "ino": None, "offset": 0}
+        self._trades = []
+        self._trade_times = []
+        self._equity_read = {"key": None, "ino": None, "offset": 0}
+        self._equity_ts = []
+        self._equity = []
+        self._equity_array = None
+    
+    def _migrate_legacy_files(self):
+        """Convert the old whole-file trades.json/equity_curve.json stores once"""
+        legacy_trades = self.trades_file.with_suffix(".json")
+        if not self.trades_file.exists() and legacy_trades.exists():
+            with open(legacy_trades, "r") as f:
+                self._append(self.trades_file, json.load(f), replace=True)
+        
+        legacy_equity = self.equity_file.with_suffix(".json")
+        if not self.equity_file.exists() and legacy_equity.exists():
+            with open(legacy_equity, "r") as f:
+                equity_data = json.load(f)
+            
+            # The starting balance was stored without a timestamp
+            equity = equity_data["equity"]
+            offset = len(equity) - len(equity_data["timestamps"])
+            records = [{"t": None, "e": e} for e in equity[:offset]]
+            records += [{"t": t, "e": e} for t, e in zip(equity_data["timestamps"], equity[offset:])]
+            self._append(self.equity_file, records, replace=True)
+    
+    @staticmethod
+    def _append(path, records, replace=False):
+        """Write records as compact JSON lines; replace=True writes the whole file atomically"""
+        payload = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        if replace:
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(payload)
+            os.replace(tmp, path)
+        else:
+            with open(path, "a") as f:
+                f.write(payload)
     
     def add_trade(self, trade_data):
         """Add a new trade to the portfolio"""
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
-        
-        trade_data["timestamp"] = datetime.utcnow().isoformat()
-        trades.append(trade_data)
+        if hasattr(trade_data, "to_dict"):
+            trade_data = trade_data.to_dict()
         
-        with open(self.trades_file, "w") as f:
-            json.dump(trades, f, indent=2)
+        # Trades from the execution agent carry their own fill time; anything else is stamped
+        # now, with unix seconds alongside the ISO string so reads compare floats
+        if "timestamp_ns" not in trade_data:
+            now = time.time()
+            trade_data["timestamp"] = datetime.utcfromtimestamp(now).isoformat()
+            trade_data["ts"] = now
+        self._append(self.trades_file, [trade_data])
     
     def update_equity(self, new_equity):
         """Update the equity curve"""
-        with open(self.equity_file, "r") as f:
-            equity_data = json.load(f)
+        self._append(self.equity_file, [{"t": datetime.utcnow().isoformat(), "e": new_equity}])
+    
+    @staticmethod
+    def _read_appended(path, state):
+        """(rewritten, records): lines appended to path since the previous read
+
+        state holds the file identity and offset from that read. A different inode or a
+        shorter file means it was replaced, and the caller must drop what it parsed before.
+        """
+        st = os.stat(path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == state["key"]:
+            return False, []
         
-        equity_data["timestamps"].append(datetime.utcnow().isoformat())
-        equity_data["equity"].append(new_equity)
+        rewritten = st.st_ino != state["ino"] or st.st_size < state["offset"]
+        if rewritten:
+            state["offset"] = 0
         
-        with open(self.equity_file, "w") as f:
-            json.dump(equity_data, f, indent=2)
+        with open(path, "rb") as f:
+            f.seek(state["offset"])
+            chunk = f.read()
+        
+        # Only complete lines; a line still being written is picked up on the next read
+        end = chunk.rfind(b"\n") + 1
+        records = [json.loads(line) for line in chunk[:end].splitlines() if line.strip()]
+        state["ino"] = st.st_ino
+        state["offset"] += end
+        state["key"] = key if end == len(chunk) else None
+        return rewritten, records
+    
+    def _refresh_trades(self):
+        rewritten, records = self._read_appended(self.trades_file, self._trades_read)
+        if rewritten:
+            self._trades = []
+            self._trade_times = []
+        for trade in records:
+            self._trades.append(trade)
+            ts = trade.get("ts")
+            if ts is None and "timestamp_ns" in trade:
+                ts = trade["timestamp_ns"] / 1e9
+            if ts is None:
+                # Trades written before "ts" existed carry only the naive UTC ISO string
+                ts = datetime.fromisoformat(trade["timestamp"]).replace(tzinfo=timezone.utc).timestamp()
+            self._trade_times.append(ts)
+    
+    def _refresh_equity(self):
+        rewritten, records = self._read_appended(self.equity_file, self._equity_read)
+        if rewritten:
+            self._equity_ts = []
+            self._equity = []
+        for record in records:
+            if record["t"] is not None:
+                self._equity_ts.append(record["t"])
+            self._equity.append(record["e"])
+        if rewritten or records:
+            self._equity_array = None
     
     def get_trades(self, days_back=30):
         """Get trades from the last N days"""
-        with open(self.trades_file, "r") as f:
-            trades = json.load(f)
-        
-        cutoff = datetime.utcnow() - timedelta(days=days_back)
-        recent_trades = [
-            trade for trade in trades 
-            if datetime.fromisoformat(trade["timestamp"]) > cutoff
-        ]
-        return recent_trades
+        cutoff = time.time() - days_back * 86400
+        with self._lock:
+            self._refresh_trades()
+            # Trades are stored oldest first, so the window starts at a binary-searched index;
+            # callers get copies so they can't alter the cached history
+            return [dict(trade) for trade in self._trades[bisect_right(self._trade_times, cutoff):]]
     
     def get_equity_curve(self):
         """Get the equity curve data"""
-        with open(self.equity_file, "r") as f:
-            return json.load(f)
+        with self._lock:
+            self._refresh_equity()
+            return {"timestamps": list(self._equity_ts), "equity": list(self._equity)}
+    
+    def equity_array(self):
+        """The equity curve as a read-only float64 array, rebuilt only after new entries"""
+        with self._lock:
+            self._refresh_equity()
+            if self._equity_array is None:
+                self._equity_array = np.asarray(self._equity, dtype=np.float64)
+                self._equity_array.setflags(write=False)
+            return self._equity_array
 
 # Global portfolio tracker instance
 portfolio_tracker = PortfolioTracker()
@@ -83,36 +189,15 @@ def get_portfolio_metrics():
             "trade_frequency": 0.0
         }
     
-    equity_series = np.array(equity_data["equity"])
-    returns = np.diff(equity_series) / equity_series[:-1]
-    
-    # Calculate Sharpe ratio
-    if len(returns) > 1 and np.std(returns) > 0:
-        sharpe = np.mean(returns) / np.std(returns) * np.sqrt(252)
-    else:
-        sharpe = 0.0
-    
-    # Calculate Sortino ratio
-    negative_returns = returns[returns < 0]
-    if len(negative_returns) > 0:
-        downside_std = np.std(negative_returns)
-        sortino = np.mean(returns) / downside_std * np.sqrt(252) if downside_std > 0 else 0.0
-    else:
-        sortino = sharpe
-    
-    # Calculate maximum drawdown
-    peak = np.maximum.accumulate(equity_series)
-    drawdown = np.max((peak - equity_series) / peak) * 100
-    
-    # Calculate win rate
-    winning_trades = [t for t in trades if t.get("pnl", 0) > 0]
-    win_rate = len(winning_trades) / len(trades) if trades else 0.5
+    equity_series = portfolio_tracker.equity_array()
     
-    # Calculate average return
-    avg_return = np.mean([t.get("pnl", 0) for t in trades]) if trades else 0.0
+    # Sharpe, Sortino, max drawdown and volatility in one pass over the curve
+    sharpe, sortino, drawdown, volatility = compute_metrics(equity_series)
     
-    # Calculate volatility
-    volatility = np.std(returns) if len(returns) > 1 else 0.02
+    # Calculate win rate and average return
+    pnl = np.fromiter((t.get("pnl", 0) for t in trades), dtype=np.float64, count=len(trades))
+    win_rate = float((pnl > 0).mean()) if trades else 0.5
+    avg_return = float(pnl.mean()) if trades else 0.0
     
     # Trade frequency (trades per day)
     trade_frequency = len(trades) / 30.0
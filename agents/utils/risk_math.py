@@ -0,0 +1,62 @@
+# agents/utils/risk_math.py
+
+import numpy as np
+
+# Shares the numba shim (and its on-disk kernel cache location) with the indicator kernels
+from agents.utils._indicators import njit
+
+# Volatility regimes as integer codes for the kernel
+REGIME_CODES = {"low": 0, "normal": 1, "high": 2, "extreme": 3}
+
+@njit("UniTuple(float64, 5)(float64, float64, float64, float64[:], float64[:], float64, float64, float64, "
+      "float64, float64, float64, float64, int64, float64, float64)", cache=True)
+def _size_kernel(balance, base_risk, vix, vix_thresh, vix_mult, win_rate, sharpe, dd,
+                 wr_thr, sh_thr, max_dd, vol, regime_code, stop_pips, max_pair_risk):
+    """Risk amount, rounded size, capped final size, and the VIX and performance multipliers"""
+    risk = balance * base_risk
+
+    # VIX penalty: highest threshold at or below the VIX (thresholds ascending)
+    vix_multiplier = 1.0
+    idx = np.searchsorted(vix_thresh, vix, side="right") - 1
+    if idx >= 0:
+        vix_multiplier = vix_mult[idx]
+    risk *= vix_multiplier
+
+    # Performance penalties, combined before applying as in apply_performance_penalty
+    multiplier = 1.0
+    if win_rate < wr_thr:
+        multiplier *= 0.5 + (win_rate / wr_thr) * 0.5
+    if sharpe < sh_thr:
+        multiplier *= 0.5 + max(0.0, sharpe / sh_thr) * 0.5
+    if dd > max_dd * 0.5:
+        multiplier *= max(0.1, 1.0 - (dd / max_dd) * 0.5)
+    risk *= multiplier
+
+    # Volatility regime
+    if regime_code == 2:
+        risk *= 0.7
+    elif regime_code == 3:
+        risk *= 0.4
+
+    # $10 per pip with a stop, otherwise scale by volatility; round half-even to 1000 units
+    if stop_pips > 0:
+        size = risk / (stop_pips * 10.0)
+    else:
+        size = risk / (vol * balance)
+    size = max(1000.0, np.rint(size / 1000.0) * 1000.0)
+
+    return risk, size, min(size, max_pair_risk / 1.1), vix_multiplier, multiplier
+
+@njit("Tuple((float64, float64, float64, float64[:]))(float64, float64, float64, float64[:], float64[:], "
+      "float64, float64, float64, float64, float64, float64, float64, int64, float64[:], float64)", cache=True)
+def _size_kernel_batch(balance, base_risk, vix, vix_thresh, vix_mult, win_rate, sharpe, dd,
+                       wr_thr, sh_thr, max_dd, vol, regime_code, stops, max_pair_risk):
+    """_size_kernel over an array of stops sharing one set of market inputs"""
+    finals = np.empty(stops.shape[0])
+    risk = vix_multiplier = multiplier = 0.0
+    for i in range(stops.shape[0]):
+        risk, _, finals[i], vix_multiplier, multiplier = _size_kernel(
+            balance, base_risk, vix, vix_thresh, vix_mult, win_rate, sharpe, dd,
+            wr_thr, sh_thr, max_dd, vol, regime_code, stops[i], max_pair_risk
+        )
+    return risk, vix_multiplier, multiplier, finals
@@ -1,8 +1,14 @@
 # agents/yield_rotation_agent.py
 
+import os
+import json
 import time
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
+from pathlib import Path
 from agents.utils.logger import log_event
 from utils.alerts import send_system_alert
 
@@ -32,18 +38,67 @@ class YieldRotationAgent:
                 "cap": 0.25
             }
         ]
+        self.response_ttl = self.rotation_interval  # Seconds a fetched yields payload is reused
+        self.cache_dir = Path("data/http_cache")  # Last good payload per URL, survives restarts
+        self._response_cache = {}  # url -> (wall-clock time, pools)
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(max_retries=Retry(total=2, backoff_factor=0.5)))
+
+    def _cache_path(self, url):
+        return self.cache_dir / (hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def _load_cached(self, url):
+        """(fetched_at, pools) from the on-disk cache, or None"""
+        try:
+            entry = json.loads(self._cache_path(url).read_text())
+            return entry["fetched_at"], entry["pools"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cached(self, url, fetched_at, pools):
+        path = self._cache_path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps({"url": url, "fetched_at": fetched_at, "pools": pools}))
+            os.replace(tmp, path)
+        except OSError as e:
+            log_event("yield_cache_write_error", {"url": url, "error": str(e)})
+
+    def fetch_pools(self, url):
+        """Pool list from a yields API, fetched at most once per response_ttl"""
+        now = time.time()
+        cached = self._response_cache.get(url) or self._load_cached(url)
+        if cached is not None and now - cached[0] < self.response_ttl:
+            self._response_cache[url] = cached
+            return cached[1]
+
+        try:
+            response = self._http.get(url, timeout=(5, 30))
+            response.raise_for_status()
+            pools = response.json().get("data", [])
+        except (requests.RequestException, ValueError) as e:
+            if cached is None:
+                raise
+            # Serve the last good payload rather than skipping the rotation
+            log_event("yield_fetch_stale", {"url": url, "age_s": round(now - cached[0]), "error": str(e)})
+            return cached[1]
+
+        self._response_cache[url] = (now, pools)
+        self._save_cached(url, now, pools)
+        return pools
 
     def fetch_yields(self):
         """Fetch yield data and filter for supported protocols"""
         try:
+            # Sources share an API, so each unique URL is downloaded once per rotation
+            pools = {url: self.fetch_pools(url) for url in {s["api"] for s in self.yield_sources}}
+
             result = []
             for source in self.yield_sources:
-                res = requests.get(source["api"]).json()
-                matches = list(filter(source["filter"], res.get("data", [])))
-                for match in matches:
-                    match["source"] = source["name"]
-                    match["cap"] = source["cap"]
-                    result.append(match)
+                for match in filter(source["filter"], pools[source["api"]]):
+                    # Copy so the cached pools are never tagged with a source
+                    result.append({**match, "source": source["name"], "cap": source["cap"]})
             return result
         except Exception as e:
             log_event("yield_rotation_error", {"error": str(e)})
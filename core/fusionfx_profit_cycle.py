@@ -1,16 +1,21 @@
 # core/fusionfx_profit_cycle.py
 
+import os
 import time
 import random
 import requests
 import json
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from utils.alerts import send_system_alert
 
+def to_cents(amount):
+    """Dollar amount (number or string) to integer cents; Decimal only at this boundary"""
+    return int((Decimal(str(amount)) * 100).to_integral_value(ROUND_HALF_EVEN))
+
 class FusionFXProfitCycle:
     def __init__(self):
-        self.withdraw_ratio = Decimal("0.70")
-        self.reinvest_ratio = Decimal("0.30")
+        # Money is held as integer cents; the split is an integer ratio (70% withdraw, rest reinvested)
+        self.withdraw_num, self.withdraw_den = 70, 100
         self.withdraw_address = "your_cold_wallet_here"
         self.exchange_api = "your_exchange_api_key_here"
         self.yield_platforms = [
@@ -20,25 +25,26 @@ class FusionFXProfitCycle:
             {"name": "Yearn", "chain": "Ethereum", "min_tvl": 20000000}
         ]
         self.nft_platform = {"name": "NFTX", "chain": "Ethereum", "min_floor_price": 0.3}
-        self.compound_threshold = Decimal("50.00")
+        self.compound_threshold = 5000  # Cents ($50.00)
+        self.compound_buffer_path = "data/compound_buffer.json"
 
     def fetch_profit(self):
         # Simulate or connect to your real system
         try:
             with open("data/profit_buffer.json", "r") as f:
-                return Decimal(json.load(f).get("unclaimed_profit", 0))
+                return to_cents(json.load(f).get("unclaimed_profit", 0))
         except:
-            return Decimal("0.00")
+            return 0
 
     def allocate_profit(self, profit):
-        withdraw_amount = profit * self.withdraw_ratio
-        reinvest_amount = profit * self.reinvest_ratio
+        withdraw_amount = profit * self.withdraw_num // self.withdraw_den
+        reinvest_amount = profit - withdraw_amount  # The two always add up to the profit
         return withdraw_amount, reinvest_amount
 
     def auto_withdraw(self, amount):
         # Replace with actual withdrawal integration
-        send_system_alert(f"🚀 Withdrawing ${amount:.2f} to cold wallet {self.withdraw_address}")
-        print(f"Withdraw ${amount:.2f} to cold wallet at {self.withdraw_address}")
+        send_system_alert(f"🚀 Withdrawing ${amount / 100:.2f} to cold wallet {self.withdraw_address}")
+        print(f"Withdraw ${amount / 100:.2f} to cold wallet at {self.withdraw_address}")
 
     def select_yield_pool(self):
         viable = []
@@ -58,8 +64,8 @@ class FusionFXProfitCycle:
         if not platform:
             print("⚠️ No yield pools passed TVL check")
             return
-        send_system_alert(f"💹 Reinvesting ${amount:.2f} into {platform['name']} on {platform['chain']}")
-        print(f"Reinvesting ${amount:.2f} into {platform['name']} on {platform['chain']}")
+        send_system_alert(f"💹 Reinvesting ${amount / 100:.2f} into {platform['name']} on {platform['chain']}")
+        print(f"Reinvesting ${amount / 100:.2f} into {platform['name']} on {platform['chain']}")
 
     def stake_nfts_if_idle(self):
         # Placeholder for NFT staking logic
@@ -68,21 +74,29 @@ class FusionFXProfitCycle:
             print(f"🖼️ Staking NFT via {self.nft_platform['name']} at floor price {floor_price:.2f} ETH")
 
     def compound_yield(self):
-        try:
-            with open("data/compound_buffer.json", "r") as f:
-                buffer = Decimal(json.load(f).get("pending_yield", 0))
-        except:
-            buffer = Decimal("0.00")
+        # One read-write handle for the whole update, creating the buffer if it is missing
+        fd = os.open(self.compound_buffer_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as f:
+            try:
+                data = json.load(f)
+                # Older buffers stored the amount as a dollar string
+                buffer = int(data["pending_yield_cents"]) if "pending_yield_cents" in data else to_cents(data.get("pending_yield", 0))
+            except:
+                buffer = 0
+
+            if buffer >= self.compound_threshold:
+                print(f"♻️ Compounding ${buffer / 100:.2f} back into investment")
+                send_system_alert(f"♻️ Auto-compounding ${buffer / 100:.2f} yield")
+                buffer = 0
+            else:
+                print(f"Compound buffer: ${buffer / 100:.2f} (below threshold)")
 
-        if buffer >= self.compound_threshold:
-            print(f"♻️ Compounding ${buffer:.2f} back into investment")
-            send_system_alert(f"♻️ Auto-compounding ${buffer:.2f} yield")
-            buffer = Decimal("0.00")
-        else:
-            print(f"Compound buffer: ${buffer:.2f} (below threshold)")
-        
-        with open("data/compound_buffer.json", "w") as f:
-            json.dump({"pending_yield": str(buffer)}, f)
+            f.seek(0)
+            f.truncate()
+            json.dump({"pending_yield_cents": buffer}, f)
+            # The buffer holds money and each run writes it once, so every write is made durable
+            f.flush()
+            os.fsync(f.fileno())
 
     def run(self):
         profit = self.fetch_profit()
@@ -13,6 +13,18 @@ def get_system_health():
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
     }
 
+# Last reading shared by is_overloaded/print_health: (monotonic time, health dict)
+SNAPSHOT_TTL = 30
+_snapshot = None
+
+def get_snapshot(ttl=SNAPSHOT_TTL):
+    """get_system_health(), reused for ttl seconds so one check cycle probes once"""
+    global _snapshot
+    now = time.monotonic()
+    if _snapshot is None or now - _snapshot[0] >= ttl:
+        _snapshot = (now, get_system_health())
+    return _snapshot[1]
+
 def is_overloaded(thresholds=None):
     if thresholds is None:
         thresholds = {
@@ -21,7 +33,7 @@ def is_overloaded(thresholds=None):
             "disk": 90
         }
     
-    health = get_system_health()
+    health = get_snapshot()
     return (
         health["cpu_percent"] > thresholds["cpu"] or
         health["memory_percent"] > thresholds["memory"] or
@@ -29,5 +41,5 @@ def is_overloaded(thresholds=None):
     )
 
 def print_health():
-    health = get_system_health()
+    health = get_snapshot()
     print(f"[HEALTH] {health['timestamp']} | CPU: {health['cpu_percent']}% | RAM: {health['memory_percent']}% | Disk: {health['disk_percent']}%")
\ No newline at end of file
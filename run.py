@@ -15,7 +15,6 @@ AGENT_SCRIPTS = [
     "agents/execution_agent.py",
     "agents/dao_governor.mjs",
     "agents/profit_manager.py",
-    "agents/cloud_nomad.py",
     "agents/depin_manager.py",
     "core/meta_controller.py",
     "core/strategist_agent.py"
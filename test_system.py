@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 # test_system.py - Test script for FusionFX system
 
+import asyncio
 import sys
 import os
 import time
+import threading
 from pathlib import Path
 
 # Add project root to path
@@ -204,6 +206,17 @@ def test_integration():
         # Test FusionAgent (integrates multiple components)
         from agents.fusion_agent import FusionAgent
         fusion = FusionAgent()
+        asyncio.run(fusion.execute())
+        
+        # Agreeing scanner and predictor signals must reach the executor
+        orders = []
+        fusion.scan = lambda pair: {"pair": pair, "bias": 1}
+        fusion.predictor.forecast_direction = lambda pair: {"pair": pair, "bias": 1}
+        fusion.executor.execute_order = orders.append
+        asyncio.run(fusion.execute())
+        if not orders or orders[0]["direction"] != "buy":
+            print("❌ FusionAgent pipeline did not place the agreed order")
+            return False
         print("✅ FusionAgent integration works")
         
         # Test execution flow
@@ -226,6 +239,60 @@ def test_integration():
         print(f"❌ Integration error: {e}")
         return False
 
+def test_news_blackout():
+    """Test news blackout keyword matching"""
+    print("\nTesting news blackout...")
+    
+    try:
+        from datetime import datetime, timedelta
+        from agents.news_sentinel import NewsSentinel
+        
+        # "CPI" is a prefix of "CPI m/m"; the shorter keyword's wider window must still apply
+        sentinel = NewsSentinel({"CPI": {"pre": 5, "post": 5}, "CPI m/m": {"pre": 0, "post": 0}})
+        now = datetime(2025, 1, 1, 12, 0)
+        event = {"title": "US CPI m/m", "time": (now + timedelta(hours=2)).isoformat() + "Z"}
+        if not sentinel.evaluate_news(event, now):
+            print("❌ Prefix-overlapping keyword missed")
+            return False
+        print("✅ Prefix-overlapping keywords both match")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ News blackout error: {e}")
+        return False
+
+def test_launcher():
+    """Test that agents started by the launcher actually run their loop"""
+    print("\nTesting launcher...")
+    
+    try:
+        from start_fusionfx import FusionFXSystem
+        from agents.risk_kernel import RiskKernel
+        system = FusionFXSystem()
+        
+        # Run the risk kernel the way start_core_agents does and wait for its first risk check
+        kernel = RiskKernel()
+        ticked = threading.Event()
+        get_risk_metrics = kernel.get_risk_metrics
+        def record_tick(*args, **kwargs):
+            ticked.set()
+            return get_risk_metrics(*args, **kwargs)
+        kernel.get_risk_metrics = record_tick
+        
+        thread = threading.Thread(target=system._run_agent, args=("risk_kernel", kernel), daemon=True)
+        thread.start()
+        if not ticked.wait(30):
+            print("❌ RiskKernel loop did not run under the launcher")
+            return False
+        print("✅ RiskKernel loop runs under the launcher")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Launcher error: {e}")
+        return False
+
 def create_directories():
     """Create necessary directories"""
     directories = [
@@ -257,7 +324,9 @@ def main():
         test_functionality,
         test_data_persistence,
         test_alerts,
-        test_integration
+        test_integration,
+        test_news_blackout,
+        test_launcher
     ]
     
     passed = 0
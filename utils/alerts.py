@@ -1,6 +1,10 @@
 # utils/alerts.py
 
+import atexit
 import os
+import queue
+import threading
+import time
 import requests
 from dotenv import load_dotenv
 
@@ -14,6 +18,16 @@ TWILIO_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_FROM = os.getenv("TWILIO_FROM_NUMBER")
 TWILIO_TO = os.getenv("TWILIO_TO_NUMBER")
 
+# One keep-alive session for all outbound alert traffic
+_session = requests.Session()
+
+# Trade alerts are queued and coalesced by a background worker
+_alert_q = queue.Queue()
+_alert_window = 0.1  # seconds
+_TELEGRAM_MAX_CHARS = 4096  # sendMessage rejects longer texts outright
+_alert_worker = None
+_alert_worker_lock = threading.Lock()
+
 def send_telegram(message):
     """Send message via Telegram bot"""
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
@@ -24,7 +38,7 @@ def send_telegram(message):
     data = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
     
     try:
-        response = requests.post(url, data=data, timeout=10)
+        response = _session.post(url, data=data, timeout=10)
         if response.status_code == 200:
             print(f"[TELEGRAM] Sent: {message}")
             return True
@@ -50,7 +64,7 @@ def send_sms(message):
             "Body": message
         }
         
-        response = requests.post(url, auth=auth, data=data, timeout=10)
+        response = _session.post(url, auth=auth, data=data, timeout=10)
         if response.status_code == 201:
             print(f"[SMS] Sent: {message}")
             return True
@@ -77,9 +91,63 @@ def send_critical_alert(message):
     """Send critical alert via all channels"""
     return send_alert(f"🚨 CRITICAL: {message}", channels=["telegram", "sms"])
 
+def _send_batch(batch):
+    """Send queued alerts as few Telegram messages as fit under the length limit"""
+    message = ""
+    for line in batch:
+        # A single oversized alert is cut into limit-sized pieces
+        for start in range(0, max(len(line), 1), _TELEGRAM_MAX_CHARS):
+            piece = line[start:start + _TELEGRAM_MAX_CHARS]
+            if message and len(message) + 1 + len(piece) > _TELEGRAM_MAX_CHARS:
+                send_alert(message, channels=["telegram"])
+                message = ""
+            message = f"{message}\n{piece}" if message else piece
+    if message:
+        send_alert(message, channels=["telegram"])
+
+def _drain_alerts():
+    """Send queued trade alerts, merging everything that arrives within one window"""
+    while True:
+        batch = [_alert_q.get()]
+        deadline = time.monotonic() + _alert_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_alert_q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _send_batch(batch)
+
+def _ensure_alert_worker():
+    global _alert_worker
+    if _alert_worker is None:
+        with _alert_worker_lock:
+            if _alert_worker is None:
+                _alert_worker = threading.Thread(target=_drain_alerts, name="alert-batcher", daemon=True)
+                _alert_worker.start()
+
+@atexit.register
+def _flush_alerts():
+    """Send whatever is still queued when the process exits"""
+    batch = []
+    while True:
+        try:
+            batch.append(_alert_q.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _send_batch(batch)
+
 def send_trade_alert(message):
-    """Send trade-related alert"""
-    return send_alert(f"💰 TRADE: {message}", channels=["telegram"])
+    """Queue a trade-related alert; bursts are sent as one message
+
+    Returns None: delivery happens later on the alert-batcher thread, so there is no
+    success flag to report here.
+    """
+    _ensure_alert_worker()
+    _alert_q.put(f"💰 TRADE: {message}")
 
 def send_system_alert(message):
     """Send system-related alert"""